@@ -0,0 +1,347 @@
+# Headless benchmarks for the calendar views, the task search window, the side
+# panels and task mutations. Every run builds a fresh database of generated
+# users and tasks in a scratch directory, times each operation under the
+# offscreen Qt platform and writes the results as JSON:
+#
+#   python benchmark.py --users 3 --tasks 20000 --out before.json
+#   python benchmark.py --users 3 --tasks 20000 --out after.json
+#   python benchmark.py --compare before.json after.json
+#
+# Wall times include waiting for the database worker and painting the result.
+# Queries are the statements run on both the GUI and the worker connection
+# (trigger bodies not counted). Peak memory is Python allocations only, taken
+# from one extra traced run.
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+WORDS = (
+    "report meeting review call draft budget plan email design fix deploy "
+    "client team weekly notes update invoice lunch gym doctor groceries "
+    "dentist study exam homework project slides demo backlog sprint release "
+    "interview onboarding migrate refactor schedule travel tickets birthday"
+).split()
+PRIORITY_WEIGHTS = {"Low": 3, "Medium": 5, "High": 2}
+
+
+# Database
+
+
+def _words(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def _fake_task(rng: random.Random, today: date) -> tuple:
+    # Most tasks sit within a few months of today, on weekdays and in working
+    # hours; past ones are mostly completed
+    day = today + timedelta(days=round(rng.gauss(0, 75)))
+    if day.weekday() >= 5 and rng.random() < 0.6:
+        day -= timedelta(days=day.weekday() - 4)
+    hour = min(max(round(rng.gauss(13, 3.5)), 0), 23)
+    minute = rng.choice((0, 0, 15, 30, 30, 45, rng.randint(0, 59)))
+    priority = rng.choices(list(PRIORITY_WEIGHTS),
+                           weights=PRIORITY_WEIGHTS.values())[0]
+    completed = rng.random() < (0.75 if day < today else 0.05)
+    return (_words(rng, 1, 6).capitalize(), _words(rng, 0, 40), priority,
+            "Completed" if completed else "Pending",
+            day.isoformat(), hour, minute)
+
+
+def generate(conn, users: int, tasks: int, seed: int) -> list:
+    # Adds `users` users with `tasks` tasks each and returns their ids
+    rng = random.Random(seed)
+    today = date.today()
+    user_ids = []
+    for n in range(users):
+        cur = conn.execute(
+            "INSERT INTO user (username, password) VALUES (?, ?)",
+            (f"user{n}", f"password{n}"))
+        user_ids.append(cur.lastrowid)
+        conn.executemany("""
+            INSERT INTO task (task_name, content, priority, status,
+                              date, hour, minute, user_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (_fake_task(rng, today) + (cur.lastrowid,) for _ in range(tasks)))
+    conn.commit()
+    return user_ids
+
+
+# Measuring
+
+
+class Bench:
+    def __init__(self, app, repeat: int):
+        self.app = app
+        self.repeat = repeat
+        self.queries = 0
+        self.results = {}
+
+    def count(self, statement: str) -> None:
+        if not statement.startswith("--"):
+            self.queries += 1
+
+    def wait_until(self, done, timeout: float = 30) -> None:
+        deadline = time.perf_counter() + timeout
+        while not done():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("benchmark step did not finish")
+            self.app.processEvents()
+
+    def measure(self, name: str, run, setup=None) -> None:
+        times = []
+        queries = []
+        for _ in range(self.repeat):
+            if setup is not None:
+                setup()
+            self.queries = 0
+            start = time.perf_counter()
+            run()
+            times.append((time.perf_counter() - start) * 1000)
+            queries.append(self.queries)
+
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        self.results[name] = {
+            "wall_ms": {
+                "median": round(statistics.median(times), 3),
+                "min": round(min(times), 3),
+                "max": round(max(times), 3),
+            },
+            "queries": statistics.median_low(queries),
+            "peak_kib": round(peak / 1024, 1),
+        }
+        print(f"{name:<34} {statistics.median(times):9.2f} ms "
+              f"{statistics.median_low(queries):5} queries "
+              f"{peak / 1024:9.1f} KiB", file=sys.stderr)
+
+
+def run_benchmarks(args) -> dict:
+    # Everything below reads ~/.mandarina, so HOME must point at the scratch
+    # directory before the first import
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    home = os.environ["HOME"] = tempfile.mkdtemp(prefix="mandarina-bench-")
+
+    from PySide6 import __version__ as pyside_version
+    from PySide6.QtWidgets import QApplication
+    app = QApplication([])
+
+    from db_setup import connection, release, set_up_db
+    from commit_queue import CommitQueue
+    from task_repository import TaskRepository
+    from db_worker import DbWorker
+    from task_store import TaskStore
+    from theme import apply_theme
+    from config import config
+    from main_window import Window
+
+    started = time.perf_counter()
+    set_up_db()
+    conn = connection()
+    user_ids = generate(conn, args.users, args.tasks, args.seed)
+    generated = time.perf_counter() - started
+
+    bench = Bench(app, args.repeat)
+    commits = CommitQueue(conn)
+    repo = TaskRepository(conn, commits)
+    db = DbWorker(commits)
+    conn.set_trace_callback(bench.count)
+    traced = []
+    db.submit(lambda repo: repo.conn.set_trace_callback(bench.count),
+              traced.append)
+    bench.wait_until(lambda: traced)
+
+    apply_theme(config["palette"], config["theme"])
+    store = TaskStore(repo, db, user_ids[0])
+    store.load()
+    window = Window(repo, store)
+    window.show()
+    calendar = window.calendar
+    today = datetime.today()
+
+    def shown() -> bool:
+        return calendar.main_widget is not calendar.placeholder
+
+    def idle() -> None:
+        bench.wait_until(lambda: calendar.pending is None
+                         and not store.prefetching
+                         and window.side_pending is None)
+
+    def cold() -> None:
+        idle()
+        store.invalidate()
+
+    # Calendar views
+
+    for view in ("day", "week", "month"):
+        render = getattr(calendar, f"render_{view}_view")
+
+        def run(render=render):
+            render(today.month, today.day, today.year)
+            bench.wait_until(shown)
+            calendar.grab()
+
+        bench.measure(f"calendar.{view}.cold", run, cold)
+        bench.measure(f"calendar.{view}.warm", run, idle)
+
+        def page(view=view):
+            window._go(1)
+            bench.wait_until(shown)
+            calendar.grab()
+
+        window.calendar_views.setCurrentText(view)
+        bench.measure(f"calendar.{view}.next", page, idle)
+        window._go_today()
+
+    # Side panels
+
+    month = store.tasks_by_day(today.replace(day=1),
+                               today.replace(day=1) + timedelta(days=31))
+    task_id = next((t.id for tasks in month.values() for t in tasks), 0)
+    for panel in ("", "settings", "task info", "task edit", "task insertion"):
+        def show(panel=panel):
+            window._render_side_bar(panel, task_id)
+            bench.wait_until(lambda: window.side_pending is None)
+            window.side_stack.grab()
+
+        bench.measure(f"side_bar.{panel.replace(' ', '_') or 'today'}",
+                      show, idle)
+
+    # Task search window
+
+    window._show_all_tasks()
+    tasks_window = window.task_window
+    tasks_window.keyword.setText(WORDS[0])
+    for kind in ("all", "keyword", "priority", "status", "time"):
+        def search(kind=kind):
+            tasks_window.filter(kind)
+            bench.wait_until(lambda: not tasks_window.tasks_model.is_loading())
+            tasks_window.tasks_found.grab()
+
+        bench.measure(f"tasks_window.filter.{kind}", search,
+                      lambda: bench.wait_until(
+                          lambda: not tasks_window.tasks_model.is_loading()))
+    window._show_all_tasks()
+
+    # Mutations, each committed and repainted
+
+    added = []
+    day = today.strftime("%Y-%m-%d")
+
+    def settle() -> None:
+        commits.flush()
+        app.processEvents()
+        calendar.grab()
+
+    def insert():
+        added.append(store.insert("Benchmark task", "", "Medium", day, 9, 30))
+        settle()
+
+    def update():
+        store.update(added[0].id, "Benchmark task (moved)", "", "High",
+                     day, 10, 0)
+        added.append(added.pop(0))
+        settle()
+
+    def set_status():
+        store.set_status(added[0].id, "Completed")
+        added.append(added.pop(0))
+        settle()
+
+    def delete():
+        store.delete(added.pop().id)
+        settle()
+
+    for name, run in (("insert", insert), ("update", update),
+                      ("set_status", set_status), ("delete", delete)):
+        bench.measure(f"mutation.{name}", run, idle)
+
+    window.close()
+    db.stop()
+    commits.flush()
+    sqlite_version = conn.execute("SELECT sqlite_version()").fetchone()[0]
+    release()
+    shutil.rmtree(home, ignore_errors=True)
+
+    return {
+        "meta": {
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pyside": pyside_version,
+            "sqlite": sqlite_version,
+            "platform": platform.platform(),
+            "users": args.users,
+            "tasks_per_user": args.tasks,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "generate_s": round(generated, 2),
+            "max_rss_kib": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                            if resource is not None else None),
+        },
+        "results": bench.results,
+    }
+
+
+def compare(old_file: str, new_file: str) -> None:
+    with open(old_file) as file:
+        old = json.load(file)["results"]
+    with open(new_file) as file:
+        new = json.load(file)["results"]
+    print(f"{'benchmark':<34} {'old ms':>9} {'new ms':>9} {'change':>8} "
+          f"{'queries':>9}")
+    for name in sorted(old.keys() | new.keys()):
+        if name not in old or name not in new:
+            print(f"{name:<34} only in {'new' if name in new else 'old'} run")
+            continue
+        before = old[name]["wall_ms"]["median"]
+        after = new[name]["wall_ms"]["median"]
+        change = (after - before) / before * 100 if before else 0
+        print(f"{name:<34} {before:9.2f} {after:9.2f} {change:+7.1f}% "
+              f"{old[name]['queries']:>4}→{new[name]['queries']:<4}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Headless Mandarina benchmarks on generated data.")
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--tasks", type=int, default=5000,
+                        help="tasks per user")
+    parser.add_argument("--seed", type=int, default=14)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="JSON file for the results "
+                        "(default: benchmark-<date>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="print the change between two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = run_benchmarks(args)
+    out = args.out or f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(out, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+from PySide6.QtWidgets import QWidget
+from PySide6.QtCore import Qt, QRect, Signal, Property
+from PySide6.QtGui import QPainter, QColor, QFont, QPalette
+from calendar import Calendar as Cal
+from datetime import datetime
+from task import chip_renderer, PRIORITY_COLORS
+
+DAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+
+# Base for the calendar grids: one widget that paints every header, cell and
+# task chip itself and does its own hit-testing, instead of a tree of layouts
+# and labels. Accent colors are properties the application stylesheet sets
+# (qproperty-accent, qproperty-secAccent); priority colors start from
+# task.PRIORITY_COLORS and can be overridden the same way
+# (qproperty-highPriority, ...). Cells outside the repainted region are
+# skipped, so a single changed cell can be redrawn with update(cell rect) and
+# keeps the hit areas of every other cell.
+class CalendarGrid(QWidget):
+    task_clicked = Signal(int)
+    day_clicked = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._accent = QColor("#ff8f1f")
+        self._sec_accent = QColor("#1fc271")
+        self.priority_colors = dict(PRIORITY_COLORS)
+        self.chips = chip_renderer()
+        self.hits = {}  # cell key -> [(QRect, task id or datetime)]
+        self.cell_hits = []  # hit list of the cell being painted
+
+    def get_accent(self) -> QColor:
+        return self._accent
+
+    def set_accent(self, color: QColor) -> None:
+        self._accent = QColor(color)
+        self.update()
+
+    def get_sec_accent(self) -> QColor:
+        return self._sec_accent
+
+    def set_sec_accent(self, color: QColor) -> None:
+        self._sec_accent = QColor(color)
+        self.update()
+
+    def _priority_property(priority):
+        def get(self) -> QColor:
+            return self.priority_colors[priority]
+
+        def set(self, color: QColor) -> None:
+            self.priority_colors[priority] = QColor(color)
+            self.update()
+
+        return Property(QColor, get, set)
+
+    accent = Property(QColor, get_accent, set_accent)
+    secAccent = Property(QColor, get_sec_accent, set_sec_accent)
+    highPriority = _priority_property("High")
+    mediumPriority = _priority_property("Medium")
+    lowPriority = _priority_property("Low")
+
+    def chip_height(self) -> int:
+        return self.chips.line_height() + 4
+
+    def _fg(self) -> QColor:
+        return self.palette().color(QPalette.WindowText)
+
+    def _grid_pen(self) -> QColor:
+        color = QColor(self._fg())
+        color.setAlphaF(0.25)
+        return color
+
+    def _begin_cell(self, key) -> None:
+        self.cell_hits = self.hits[key] = []
+
+    def _draw_chip(self, painter: QPainter, rect: QRect, task) -> None:
+        self.chips.paint(painter, rect, task, self._fg(), self.priority_colors)
+        self.cell_hits.append((QRect(rect), task.id))
+
+    def _draw_more(self, painter: QPainter, rect: QRect, count: int,
+                   day: datetime) -> None:
+        painter.save()
+        painter.setPen(self._accent)
+        painter.setFont(self.chips.font)
+        painter.drawText(rect.adjusted(self.chips.INDENT, 0, 0, 0),
+                         Qt.AlignLeft | Qt.AlignTop, f"+{count} more")
+        painter.restore()
+        self.cell_hits.append((QRect(rect), day))
+
+    def _draw_day_number(self, painter: QPainter, rect: QRect, day: int,
+                         selected: bool) -> None:
+        painter.save()
+        font = QFont(self.font())
+        if selected:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self._accent)
+            painter.drawRoundedRect(rect, 5, 5)
+            font.setBold(True)
+            painter.setPen(QColor("#ffffff"))
+        else:
+            painter.setPen(self._fg())
+        painter.setFont(font)
+        painter.drawText(rect, Qt.AlignCenter, str(day))
+        painter.restore()
+
+    def _draw_cell(self, painter: QPainter, rect: QRect, tasks: list,
+                   day: datetime) -> None:
+        # Stacks chips from the top of rect; what does not fit collapses into
+        # a "+N more" entry that opens the day
+        chip_h = self.chip_height()
+        fits = max(rect.height() // chip_h, 0)
+        if len(tasks) > fits:
+            fits = max(fits - 1, 0)
+        y = rect.top()
+        for task in tasks[:fits]:
+            self._draw_chip(painter, QRect(rect.left(), y, rect.width(), chip_h),
+                            task)
+            y += chip_h
+        if len(tasks) > fits and rect.height() >= chip_h:
+            self._draw_more(painter, QRect(rect.left(), y, rect.width(), chip_h),
+                            len(tasks) - fits, day)
+
+    def mousePressEvent(self, event) -> None:
+        pos = event.position().toPoint()
+        for hits in self.hits.values():
+            for rect, target in hits:
+                if rect.contains(pos):
+                    if isinstance(target, datetime):
+                        self.day_clicked.emit(target)
+                    else:
+                        self.task_clicked.emit(target)
+                    return
+        super().mousePressEvent(event)
+
+
+class MonthGrid(CalendarGrid):
+    HEADER = 40
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.year = datetime.today().year
+        self.month = datetime.today().month
+        self.selected = datetime.today().day
+        self.tasks_by_day = {}
+        self.weeks = []
+
+    def set_month(self, year: int, month: int, selected: int,
+                  tasks_by_day: dict) -> None:
+        self.year = year
+        self.month = month
+        self.selected = selected
+        self.tasks_by_day = dict(tasks_by_day)
+        # Sunday-first weeks, 0 standing for days of other months
+        self.weeks = Cal(firstweekday=6).monthdayscalendar(year, month)
+        self.hits = {}
+        self.update()
+
+    def set_day_tasks(self, date: str, tasks: list) -> None:
+        # Rebinds a single day ("YYYY-MM-DD") and repaints only its cell
+        if (int(date[:4]), int(date[5:7])) != (self.year, self.month):
+            return
+        self.tasks_by_day[date] = tasks
+        day = int(date[8:])
+        for row, week in enumerate(self.weeks):
+            if day in week:
+                self.update(self.cell_rect(row, week.index(day)).adjusted(-1, -1, 1, 1))
+
+    def cell_rect(self, row: int, col: int) -> QRect:
+        col_w = self.width() / 7
+        row_h = (self.height() - self.HEADER) / max(len(self.weeks), 1)
+        return QRect(int(col * col_w), int(self.HEADER + row * row_h),
+                     int(col_w) - 1, int(row_h) - 1)
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        col_w = self.width() / 7
+
+        painter.setPen(self._fg())
+        for col, weekday in enumerate((6, 0, 1, 2, 3, 4, 5)):
+            painter.drawText(QRect(int(col * col_w), 0, int(col_w), self.HEADER),
+                             Qt.AlignCenter, DAYS[weekday].upper())
+
+        for row, week in enumerate(self.weeks):
+            for col, day in enumerate(week):
+                cell = self.cell_rect(row, col)
+                if day == 0 or not cell.intersects(event.rect()):
+                    continue
+                self._begin_cell(day)
+                painter.setPen(self._grid_pen())
+                painter.setBrush(Qt.NoBrush)
+                painter.drawRoundedRect(cell, 5, 5)
+
+                self._draw_day_number(
+                    painter, QRect(cell.left() + 2, cell.top() + 2, 25, 25),
+                    day, day == self.selected)
+                date = f"{self.year}-{self.month:02d}-{day:02d}"
+                self._draw_cell(painter, cell.adjusted(2, 29, -2, -2),
+                                self.tasks_by_day.get(date, []),
+                                datetime(self.year, self.month, day))
+        painter.end()
+
+
+class WeekGrid(CalendarGrid):
+    HEADER = 60
+    HOURS_WIDTH = 70
+    MIN_ROW = 30
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.week = []
+        self.selected = None
+        self.tasks_by_cell = {}
+        self.row_heights = [self.MIN_ROW] * 24
+
+    def set_week(self, week: list, selected: datetime,
+                 tasks_by_cell: dict) -> None:
+        self.week = week
+        self.selected = selected
+        self.tasks_by_cell = tasks_by_cell
+        self.hits = {}
+        # Each hour row grows to fit its busiest day, like the old layout did
+        self.row_heights = [self._row_height(hour) for hour in range(24)]
+        self.setFixedHeight(self.HEADER + sum(self.row_heights))
+        self.update()
+
+    def set_cell_tasks(self, date: str, hour: int, tasks: list) -> None:
+        # Rebinds a single (day, hour) cell; only a row that has to grow or
+        # shrink repaints more than that cell
+        days = [day.strftime("%Y-%m-%d") for day in self.week]
+        if date not in days or not 0 <= hour < 24:
+            return
+        if tasks:
+            self.tasks_by_cell[(date, hour)] = tasks
+        else:
+            self.tasks_by_cell.pop((date, hour), None)
+        height = self._row_height(hour)
+        if height != self.row_heights[hour]:
+            self.row_heights[hour] = height
+            self.setFixedHeight(self.HEADER + sum(self.row_heights))
+            self.update()
+        else:
+            self.update(self.cell_rect(days.index(date), hour).adjusted(-1, -1, 1, 1))
+
+    def _row_height(self, hour: int) -> int:
+        busiest = max([len(self.tasks_by_cell.get(
+            (day.strftime("%Y-%m-%d"), hour), [])) for day in self.week] + [1])
+        return max(self.MIN_ROW, busiest * self.chip_height() + 7)
+
+    def cell_rect(self, col: int, hour: int) -> QRect:
+        col_w = (self.width() - self.HOURS_WIDTH) / 7
+        return QRect(int(self.HOURS_WIDTH + col * col_w),
+                     self.HEADER + sum(self.row_heights[:hour]),
+                     int(col_w) - 1, self.row_heights[hour] - 1)
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        col_w = (self.width() - self.HOURS_WIDTH) / 7
+        bold = QFont(self.font())
+        bold.setBold(True)
+
+        for i, day in enumerate(self.week):
+            left = int(self.HOURS_WIDTH + i * col_w)
+            selected = day == self.selected
+            painter.setFont(bold if selected else self.font())
+            painter.setPen(self._sec_accent if selected else self._fg())
+            painter.drawText(QRect(left, 0, int(col_w), self.HEADER // 2),
+                             Qt.AlignCenter, DAYS[day.weekday()].upper())
+            self._draw_day_number(
+                painter,
+                QRect(left + int(col_w) // 2 - 12, self.HEADER // 2, 25, 25),
+                day.day, selected)
+
+        painter.setFont(self.font())
+        top = self.HEADER
+        for hour in range(24):
+            height = self.row_heights[hour]
+            painter.setPen(self._fg())
+            label = datetime.strptime(f"{hour}", "%H").strftime("%I:%M%p")
+            painter.drawText(QRect(0, top, self.HOURS_WIDTH, height),
+                             Qt.AlignLeft | Qt.AlignTop, label)
+            for i, day in enumerate(self.week):
+                cell = QRect(int(self.HOURS_WIDTH + i * col_w), top,
+                             int(col_w) - 1, height - 1)
+                if not cell.intersects(event.rect()):
+                    continue
+                date = day.strftime("%Y-%m-%d")
+                self._begin_cell((date, hour))
+                painter.setPen(self._grid_pen())
+                painter.setBrush(Qt.NoBrush)
+                painter.drawRect(cell)
+                self._draw_cell(painter, cell.adjusted(3, 3, -3, -3),
+                                self.tasks_by_cell.get((date, hour), []), day)
+            top += height
+        painter.end()
+
+
+class DayGrid(CalendarGrid):
+    HEADER = 50
+    HOURS_WIDTH = 90
+    MIN_ROW = 30
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.day = datetime.today()
+        self.by_hour = {}
+        self.row_heights = [self.MIN_ROW] * 24
+
+    def cell_width(self) -> int:
+        return self.width() - self.HOURS_WIDTH - 6
+
+    def set_day(self, day: datetime, tasks: list) -> None:
+        self.day = day
+        self.by_hour = {}
+        for task in tasks:
+            self.by_hour.setdefault(task.hour, []).append(task)
+        self.hits = {}
+        self.row_heights = [self._row_height(hour) for hour in range(24)]
+        self.setFixedHeight(self.HEADER + sum(self.row_heights))
+        self.update()
+
+    def set_hour_tasks(self, date: str, hour: int, tasks: list) -> None:
+        # Rebinds one hour of the shown day; like WeekGrid.set_cell_tasks,
+        # only a change of row height repaints the whole grid
+        if date != self.day.strftime("%Y-%m-%d") or not 0 <= hour < 24:
+            return
+        if tasks:
+            self.by_hour[hour] = tasks
+        else:
+            self.by_hour.pop(hour, None)
+        height = self._row_height(hour)
+        if height != self.row_heights[hour]:
+            self.row_heights[hour] = height
+            self.setFixedHeight(self.HEADER + sum(self.row_heights))
+            self.update()
+        else:
+            self.update(self.cell_rect(hour).adjusted(-1, -1, 1, 1))
+
+    def _row_height(self, hour: int) -> int:
+        # A single column has room for whole titles, so chips wrap here
+        # instead of eliding and each hour grows to fit its tasks
+        height = sum(self.chips.height(task.task_name, self.cell_width())
+                     for task in self.by_hour.get(hour, []))
+        return max(self.MIN_ROW, height + 7)
+
+    def cell_rect(self, hour: int) -> QRect:
+        return QRect(self.HOURS_WIDTH, self.HEADER + sum(self.row_heights[:hour]),
+                     self.width() - self.HOURS_WIDTH - 1,
+                     self.row_heights[hour] - 1)
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        bold = QFont(self.font())
+        bold.setBold(True)
+        bold.setPointSize(bold.pointSize() + 3)
+        painter.setFont(bold)
+        painter.setPen(self._sec_accent)
+        weekday = DAYS[self.day.weekday()].upper()
+        painter.drawText(QRect(10, 0, 60, self.HEADER),
+                         Qt.AlignLeft | Qt.AlignVCenter, weekday)
+        self._draw_day_number(
+            painter, QRect(10 + painter.fontMetrics().horizontalAdvance(weekday)
+                           + 8, (self.HEADER - 25) // 2, 25, 25),
+            self.day.day, True)
+
+        painter.setFont(self.font())
+        top = self.HEADER
+        for hour in range(24):
+            height = self.row_heights[hour]
+            cell = QRect(self.HOURS_WIDTH, top,
+                         self.width() - self.HOURS_WIDTH - 1, height - 1)
+            top += height
+            if not event.rect().intersects(
+                    QRect(0, cell.top(), self.width(), height)):
+                continue
+            self._begin_cell(hour)
+            painter.setPen(self._fg())
+            label = datetime.strptime(f"{hour}", "%H").strftime("%I:%M %p")
+            painter.drawText(QRect(0, cell.top(), self.HOURS_WIDTH - 10, height),
+                             Qt.AlignRight | Qt.AlignVCenter, label)
+            painter.setPen(self._grid_pen())
+            painter.setBrush(Qt.NoBrush)
+            painter.drawRoundedRect(cell, 3, 3)
+            y = cell.top() + 3
+            for task in self.by_hour.get(hour, []):
+                chip_h = self.chips.height(task.task_name, self.cell_width())
+                self._draw_chip(painter, QRect(cell.left() + 3, y,
+                                               self.cell_width(), chip_h), task)
+                y += chip_h
+        painter.end()
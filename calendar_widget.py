@@ -1,19 +1,14 @@
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QScrollArea, QLabel, QGridLayout, QGroupBox,
-    QApplication, QMainWindow, QHBoxLayout
+    QWidget, QVBoxLayout, QScrollArea, QLabel, QStackedWidget
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QGuiApplication
-from datetime import datetime
-from calendar import Calendar as Cal
-from task import Task
-import sqlite3 as sql
+from datetime import datetime, timedelta
+from calendar_grid import DayGrid, MonthGrid, WeekGrid
 
 
 class Calendar(QWidget):
-    DAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
-
-    def __init__(self, owner, uid, conn):
+    def __init__(self, owner, store):
         super().__init__()
 
         screen = QGuiApplication.primaryScreen().geometry()
@@ -22,286 +17,142 @@ class Calendar(QWidget):
         self.width = screen_width * 0.7 - 50
         self.height = screen_height * 0.7 - 50
 
-        self.user_id = uid
-        self.conn = conn
-        self.cur = self.conn.cursor()
+        self.user_id = store.user_id
+        self.store = store
         self.owner = owner
 
         self.main_layout = QVBoxLayout()
 
         self.setFixedSize(self.width, self.height)
         self.setLayout(self.main_layout)
+        self.pending = None  # database worker ticket for the range on its way
+
+        # Every view is built once and kept in the stack; rendering a view
+        # only rebinds its data and raises it
+        self.stack = QStackedWidget()
+        self.main_layout.addWidget(self.stack)
+
+        self.placeholder = QLabel("Loading tasks…")
+        self.placeholder.setObjectName("secondary")
+        self.placeholder.setAlignment(Qt.AlignCenter)
+        self.stack.addWidget(self.placeholder)
+
+        self.day_grid = DayGrid()
+        self.day_scroll = self._scrolling(self.day_grid)
+        self.week_grid = WeekGrid()
+        self.week_scroll = self._scrolling(self.week_grid)
+        self.month_grid = MonthGrid()
+        self.stack.addWidget(self.month_grid)
+        for grid in (self.day_grid, self.week_grid, self.month_grid):
+            grid.task_clicked.connect(self._open_task)
+            grid.day_clicked.connect(self.owner._open_day)
+        self.store.changed.connect(self._on_task_changed)
         self.main_widget = None
         self.render_day_view(
             datetime.today().month, datetime.today().day, datetime.today().year)
 
-    def render_day_view(self, month: int, day: int, year: int):
-        if self.main_widget:
-            self.main_layout.removeWidget(self.main_widget)
-            self.main_widget.deleteLater()
-
-        self.main_widget = QWidget()
-        layout = QVBoxLayout()
-
-        week_day = self._get_week_day(year, month, day)
-        layout.addWidget(self._create_day_header(week_day, day))
-
-        # Scroll area setup
-        scroll_area = QScrollArea()
-
-        container = QWidget()
-        container_layout = QVBoxLayout()
-
-        query = f"""
-                SELECT id, task_name, date, hour, priority, status FROM task 
-                WHERE strftime('%m', date) = '{month:02d}'
-                AND strftime('%d', date) = '{day:02d}'
-                AND strftime('%Y', date) = '{year}'
-                AND user_id = '{self.user_id}';
-                """
-        self.cur.execute(query)
-        tasks = self.cur.fetchall()
-        container_layout.addWidget(self._create_hourly_schedule(day, tasks))
-
-        container.setLayout(container_layout)
-        scroll_area.setWidget(container)
-        layout.addWidget(scroll_area)
-
-        self.main_widget.setLayout(layout)
-        self.main_layout.addWidget(self.main_widget)
-
-    def _get_week_day(self, year: int, month: int, day: int) -> str:
-        for date, week_day in Cal().itermonthdays2(year, month):
-            if date == day:
-                return self.DAYS[week_day].upper()
-        return ""
-
-    def _create_day_header(self, week_day: str, day: int) -> QWidget:
-        header = QWidget()
-        header_layout = QHBoxLayout()
-
-        day_label = QLabel(
-            f"{week_day}")
-        day_label.setObjectName("secondary")
-        header_layout.addWidget(day_label)
-
-        circle_label = QLabel(f"{day}")
-        circle_label.setFixedSize(25, 25)
-        circle_label.setAlignment(Qt.AlignCenter)
-        circle_label.setObjectName("dayLabel")
-        header_layout.addWidget(circle_label)
-        header_layout.addStretch()
+    def _when_loaded(self, start: datetime, end: datetime, render) -> bool:
+        # True when [start, end) can be drawn from the store right away.
+        # Otherwise a placeholder is shown and `render` runs again once the
+        # database worker has loaded the range.
+        if self.pending is not None:
+            self.store.db.cancel(self.pending)
+            self.pending = None
+        if self.store.has_range(start, end):
+            return True
+
+        def loaded():
+            self.pending = None
+            render()
+
+        def failed(error):
+            self.pending = None
+            self.placeholder.setText(f"Tasks could not be loaded.\n{error}")
+
+        self._show_placeholder()
+        self.pending = self.store.load_async(start, end, loaded, failed)
+        return False
+
+    def _scrolling(self, grid: QWidget) -> QScrollArea:
+        grid.setFixedWidth(self.width - 100)
+        scroll = QScrollArea()
+        scroll.setWidget(grid)
+        self.stack.addWidget(scroll)
+        return scroll
+
+    def _set_main_widget(self, widget: QWidget):
+        self.main_widget = widget
+        self.stack.setCurrentWidget(widget)
+
+    def _show_placeholder(self):
+        self.placeholder.setText("Loading tasks…")
+        self._set_main_widget(self.placeholder)
+
+    def _on_task_changed(self, change):
+        # Patches the cells of the task's old and new slots in every grid;
+        # each grid ignores slots outside the period it shows
+        for date, hour in {change.old, change.new} - {None}:
+            day = datetime.strptime(date, "%Y-%m-%d")
+            if not self.store.has_range(day, day + timedelta(days=1)):
+                continue  # not cached, so not on screen either
+            tasks = self.store.tasks_on(day)
+            in_hour = [t for t in tasks if t.hour == hour]
+            self.month_grid.set_day_tasks(date, tasks)
+            self.week_grid.set_cell_tasks(date, hour, in_hour)
+            self.day_grid.set_hour_tasks(date, hour, in_hour)
+
+    def _open_task(self, task_id: int):
+        self.owner._render_side_bar("task info", task_id)
 
-        header.setLayout(header_layout)
-        return header
-
-    def _create_hourly_schedule(self, day: int, tasks: list) -> QWidget:
-        schedule_widget = QWidget()
-        schedule_layout = QVBoxLayout()
-        schedule_layout.setSpacing(0)
-
-        for hour in range(24):
-            container = QWidget()
-            container_lay = QHBoxLayout()
-            container_lay.setContentsMargins(0, 0, 0, 0)
-            time_24 = datetime.strptime(
-                f"{hour}:00", "%H:%M")  # Create a time object
-            time_12 = time_24.strftime("%I:%M %p")
-            hour_label = QLabel(time_12)
-            container_lay.addWidget(hour_label)
-
-            hour_group = QGroupBox()
-            hour_layout = QVBoxLayout()
-            hour_layout.setSpacing(2)
-
-            for t in tasks:
-                if t[3] == hour:
-                    task_info = Task(self.owner, t[0], t[1], t[-2], t[-1])
-                    hour_layout.addWidget(task_info)
-
-            hour_group.setFixedWidth(self.width - 150)
-            hour_group.setLayout(hour_layout)
-            container_lay.addWidget(hour_group)
-            container.setLayout(container_lay)
-            schedule_layout.addWidget(container)
+    def render_day_view(self, month: int, day: int, year: int):
+        selected = datetime(year, month, day)
+        if not self._when_loaded(selected, selected + timedelta(days=1),
+                                 lambda: self.render_day_view(month, day, year)):
+            return
 
-        schedule_widget.setLayout(schedule_layout)
-        return schedule_widget
+        self.day_grid.set_day(selected, self.store.tasks_on(selected))
+        self._set_main_widget(self.day_scroll)
+        self.store.prefetch(selected - timedelta(days=1),
+                            selected + timedelta(days=2))
 
     def render_week_view(self, month: int, day: int, year: int):
-        if self.main_widget:
-            self.main_layout.removeWidget(self.main_widget)
-            self.main_widget.deleteLater()
-
-        self.main_widget = QScrollArea()
-        container = QWidget()
-        container.setFixedWidth(self.width - 100)
-        container_layout = QGridLayout()
-
+        selected = datetime(year, month, day)
         week = self._get_week_of_month(year, month, day)
-
-        for h in range(24):
-            time_24 = datetime.strptime(
-                f"{h}", "%H")  # Create a time object
-            time_12 = time_24.strftime("%I:%M%p")
-            hour_label = QLabel(time_12)
-            container_layout.addWidget(hour_label, h+1, 0)
-
-        for i, weekday in enumerate(week):
-            day_info = QWidget()
-            day_info.setFixedHeight(80)
-            day_layout = QVBoxLayout()
-
-            day_name = QLabel(self.DAYS[weekday[1]].upper())
-            day_name.setAlignment(Qt.AlignCenter)
-            day_layout.addWidget(day_name)
-
-            day_date = QLabel(f"{weekday[0]}")
-            day_date.setAlignment(Qt.AlignCenter)
-            if weekday[0] == day:
-                day_name.setObjectName("secondary")
-                day_date.setObjectName("dayLabel")
-            day_layout.addWidget(day_date)
-
-            day_info.setLayout(day_layout)
-            container_layout.addWidget(day_info, 0, i+1)
-
-            query = f"""
-                SELECT id, task_name, date, hour, priority, status FROM task 
-                WHERE strftime('%m', date) = '{month:02d}'
-                AND strftime('%d', date) = '{weekday[0]:02d}'
-                AND strftime('%Y', date) = '{year}'
-                AND user_id = '{self.user_id}';
-                """
-            self.cur.execute(query)
-            tasks = self.cur.fetchall()
-
-            for j in range(24):
-                hour_group = QGroupBox()
-                hour_layout = QVBoxLayout()
-                hour_layout.setSpacing(0)
-                hour_layout.setContentsMargins(5, 0, 5, 0)
-
-                for t in tasks:
-                    if t[3] == j:
-                        task_info = Task(self.owner, t[0], t[1], t[-2], t[-1])
-                        hour_layout.addWidget(task_info)
-
-                hour_group.setLayout(hour_layout)
-                container_layout.addWidget(hour_group, j+1, i+1)
-
-        container.setLayout(container_layout)
-        self.main_widget.setWidget(container)
-        self.main_layout.addWidget(self.main_widget)
-
-    def _get_week_of_month(self, year: int, month: int, day: int):
-        cal = Cal(firstweekday=6)  # Sunday as first day of the week
-        found_week = []
-
-        for week in cal.monthdays2calendar(year, month):
-            if any(date == day for date, _ in week):
-                found_week = week
-                break
-
-        found_week = [(d, wd) for d, wd in found_week if d != 0]
-
-        # If the week is incomplete at the start, fill with previous month's days
-        if len(found_week) < 7 and found_week[0][1] > 0:
-            prev_month = month - 1 if month > 1 else 12
-            prev_year = year if month > 1 else year - 1
-            prev_month_weeks = cal.monthdays2calendar(prev_year, prev_month)
-            last_week_prev_month = [(d, wd)
-                                    for d, wd in prev_month_weeks[-1] if d != 0]
-            missing_days = 7 - len(found_week)
-            found_week = last_week_prev_month[-missing_days:] + found_week
-
-        # If the week is incomplete at the end, fill with next month's days
-        if len(found_week) < 7:
-            next_month = month + 1 if month < 12 else 1
-            next_year = year if month < 12 else year + 1
-            next_month_weeks = cal.monthdays2calendar(next_year, next_month)
-            first_week_next_month = [(d, wd)
-                                     for d, wd in next_month_weeks[0] if d != 0]
-            missing_days = 7 - len(found_week)
-            found_week += first_week_next_month[:missing_days]
-
-        return found_week
-
-    def render_month_view(self, month: int, day: int, year: int):
-        if self.main_widget:
-            self.main_layout.removeWidget(self.main_widget)
-            self.main_widget.deleteLater()
-
-        # Create main widget and layout
-        self.main_widget = QWidget()
-        # self.main_widget.setFixedSize(600, 450)
-        main_layout = QGridLayout()
-        main_layout.setSpacing(1)  # xr
-
-        # Define weekdays order (starting from Sunday)
-        weekday_order = [6, 0, 1, 2, 3, 4, 5]
-
-        # Add weekday headers
-        for col, weekday_index in enumerate(weekday_order):
-            label = QLabel(self.DAYS[weekday_index].upper())
-            label.setFixedHeight(80)
-            label.setAlignment(Qt.AlignCenter)
-            main_layout.addWidget(label, 0, col)
-
-        # Initialize calendar and tasks
-        cal = Cal(firstweekday=6)
-        # tasks = self.get_tasks(month)
-
-        # Iterate through the days of the month
-        row, col = 1, 0
-        for date in cal.itermonthdays(year, month):
-            if col == 7:
-                row += 1
-                col = 0
-
-            if date == 0:
-                col += 1
-                continue
-
-            # Create day container
-            day_container = QScrollArea()
-            day_container.setContentsMargins(0, 0, 0, 0)
-            day_container.setFixedSize(self.width/8, self.height/7)
-
-            container = QWidget()
-            container_layout = QVBoxLayout()
-            container_layout.setSpacing(0)
-
-            # Create day label
-            day_label = QLabel(str(date))
-            day_label.setFixedSize(25, 25)
-            day_label.setAlignment(Qt.AlignCenter)
-            # Highlight current day
-            if date == day:
-                day_label.setObjectName("dayLabel")
-            container_layout.addWidget(day_label)
-
-            query = f"""
-                SELECT id, task_name, date, hour, priority, status FROM task 
-                WHERE strftime('%m', date) = '{month:02d}'
-                AND strftime('%d', date) = '{date:02d}'
-                AND strftime('%Y', date) = '{year}'
-                AND user_id = '{self.user_id}';
-                """
-            self.cur.execute(query)
-            tasks = self.cur.fetchall()
-
+        if not self._when_loaded(week[0], week[-1] + timedelta(days=1),
+                                 lambda: self.render_week_view(month, day, year)):
+            return
+
+        # The exact 7-day span, even when it crosses a month boundary,
+        # bucketed by (day, hour) in a single pass
+        tasks_by_cell = {}
+        tasks_by_day = self.store.tasks_by_day(
+            week[0], week[-1] + timedelta(days=1))
+        for tasks in tasks_by_day.values():
             for t in tasks:
-                if t[2][-2:] == f'{date:02d}':
-                    task_info = Task(self.owner, t[0], t[1], t[-2], t[-1])
-                    container_layout.addWidget(task_info)
+                tasks_by_cell.setdefault((t.date, t.hour), []).append(t)
 
-            # Set layout and add to main layout
-            container.setLayout(container_layout)
-            day_container.setWidget(container)
-            main_layout.addWidget(day_container, row, col)
+        self.week_grid.set_week(week, selected, tasks_by_cell)
+        self._set_main_widget(self.week_scroll)
+        self.store.prefetch(week[0] - timedelta(days=7),
+                            week[-1] + timedelta(days=8))
 
-            col += 1
+    def _get_week_of_month(self, year: int, month: int, day: int) -> list:
+        # Sunday-first week holding the given day, spilling into the
+        # previous/next month when the week straddles a boundary
+        selected = datetime(year, month, day)
+        sunday = selected - timedelta(days=(selected.weekday() + 1) % 7)
+        return [sunday + timedelta(days=i) for i in range(7)]
 
-        self.main_widget.setLayout(main_layout)
-        self.main_layout.addWidget(self.main_widget)
+    def render_month_view(self, month: int, day: int, year: int):
+        first_day = datetime(year, month, 1)
+        next_month = (first_day + timedelta(days=31)).replace(day=1)
+        if not self._when_loaded(first_day, next_month,
+                                 lambda: self.render_month_view(month, day, year)):
+            return
+
+        self.month_grid.set_month(year, month, day,
+                                  self.store.tasks_by_day(first_day, next_month))
+        self._set_main_widget(self.month_grid)
+        # The months either side, so paging renders from memory
+        self.store.prefetch((first_day - timedelta(days=1)).replace(day=1),
+                            (next_month + timedelta(days=31)).replace(day=1))
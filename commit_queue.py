@@ -0,0 +1,33 @@
+from PySide6.QtCore import QObject, QTimer
+import sqlite3 as sql
+
+
+# Write-behind commits for one connection. Repository writes call written()
+# instead of committing, and the open transaction is committed as one once
+# writes stop for `delay` ms, once `max_pending` writes have piled up, or when
+# flush() is called: before the database worker reads (its connection cannot
+# see uncommitted rows) and at shutdown.
+class CommitQueue(QObject):
+    def __init__(self, conn: sql.Connection, delay: int = 300,
+                 max_pending: int = 64, parent=None):
+        super().__init__(parent)
+        self.conn = conn
+        self.max_pending = max_pending
+        self.pending = 0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.flush)
+
+    def written(self) -> None:
+        self.pending += 1
+        if self.pending >= self.max_pending:
+            self.flush()
+        else:
+            self.timer.start()  # restarted, so bursts share one commit
+
+    def flush(self) -> None:
+        self.timer.stop()
+        if self.pending:
+            self.pending = 0
+            self.conn.commit()
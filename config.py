@@ -0,0 +1,32 @@
+import os
+import json
+from db_setup import CONFIG_DIR
+
+CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
+# Default configuration
+DEFAULT_CONFIG = {
+    "palette": "Mandarina",
+    "hour_format": 12,
+    "theme": "light"
+}
+
+
+def _load() -> dict:
+    # Read once per process; modules share the dict through `config`
+    try:
+        with open(CONFIG_FILE, "r") as file:
+            return {**DEFAULT_CONFIG, **json.load(file)}
+    except (OSError, ValueError):
+        # Missing or unreadable: start from the defaults and write them out
+        loaded = dict(DEFAULT_CONFIG)
+        save(loaded)
+        return loaded
+
+
+def save(values: dict | None = None) -> None:
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    with open(CONFIG_FILE, "w") as file:
+        json.dump(config if values is None else values, file, indent=4)
+
+
+config = _load()
@@ -1,17 +1,171 @@
 import sqlite3
 import os
+import threading
 from pathlib import Path
 
 CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".mandarina")
 DB_FILE = os.path.join(CONFIG_DIR, "mandarina.db")
 
+# Applied to every connection. WAL lets readers on other threads run while a
+# write commits, and with it synchronous=NORMAL only syncs at checkpoints
+# instead of on every commit.
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",  # in KiB, about 16 MB of page cache
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",
+)
+BUSY_TIMEOUT = 5  # seconds a connection waits on a lock before failing
+# Set MANDARINA_TRACE_SQL=1 to record every statement run, with its timing;
+# see query_trace.py
+TRACE_SQL = os.environ.get("MANDARINA_TRACE_SQL") == "1"
+
+_local = threading.local()
+
+
+def _migrate_start_key(cursor: sqlite3.Cursor) -> None:
+    # Sortable start key ("YYYY-MM-DD HH:MM") so calendar views can filter with
+    # range predicates over the (user_id, start) index instead of strftime().
+    # It is a virtual generated column: nothing extra is written per row, and
+    # only the index stores it.
+    columns = [column[1] for column in cursor.execute("PRAGMA table_info(task)")]
+    if "start" not in columns:
+        cursor.execute("""
+            ALTER TABLE task ADD COLUMN start TEXT GENERATED ALWAYS AS
+            (printf('%s %02d:%02d', date, hour, minute)) VIRTUAL
+        """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_task_user_start ON task (user_id, start)
+    """)
+
+
+def _migrate_sort_indexes(cursor: sqlite3.Cursor) -> None:
+    # Let the "All tasks" keyset pages walk an index in every sort order
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_task_user_name ON task (user_id, task_name)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_task_user_hour
+        ON task (user_id, hour, minute)
+    """)
+
+
+def _migrate_full_text(cursor: sqlite3.Cursor) -> None:
+    # FTS5 index over titles and notes for keyword search. It is an external
+    # content table, so the text itself is only stored once, in task.
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+            task_name, content,
+            content='task', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task
+        BEGIN
+            INSERT INTO task_fts (rowid, task_name, content)
+            VALUES (NEW.id, NEW.task_name, NEW.content);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task
+        BEGIN
+            INSERT INTO task_fts (task_fts, rowid, task_name, content)
+            VALUES ('delete', OLD.id, OLD.task_name, OLD.content);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS task_fts_update
+        AFTER UPDATE OF task_name, content ON task
+        BEGIN
+            INSERT INTO task_fts (task_fts, rowid, task_name, content)
+            VALUES ('delete', OLD.id, OLD.task_name, OLD.content);
+            INSERT INTO task_fts (rowid, task_name, content)
+            VALUES (NEW.id, NEW.task_name, NEW.content);
+        END
+    """)
+    # Indexing whatever was written before the table existed
+    cursor.execute("INSERT INTO task_fts (task_fts) VALUES ('rebuild')")
+
+
+def _migrate_task_stats(cursor: sqlite3.Cursor) -> None:
+    # Per-user task counts by status and priority, kept current by triggers
+    # so summaries read a handful of rows instead of scanning the history.
+    # NULL status/priority are counted under ''; tasks without a user are
+    # not counted.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS task_stats (
+            user_id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, status, priority)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS task_stats_insert AFTER INSERT ON task
+        WHEN NEW.user_id IS NOT NULL
+        BEGIN
+            INSERT INTO task_stats (user_id, status, priority, count)
+            VALUES (NEW.user_id, coalesce(NEW.status, ''),
+                    coalesce(NEW.priority, ''), 1)
+            ON CONFLICT DO UPDATE SET count = count + 1;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS task_stats_delete AFTER DELETE ON task
+        WHEN OLD.user_id IS NOT NULL
+        BEGIN
+            UPDATE task_stats SET count = count - 1
+            WHERE user_id = OLD.user_id
+              AND status = coalesce(OLD.status, '')
+              AND priority = coalesce(OLD.priority, '');
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS task_stats_update
+        AFTER UPDATE OF status, priority, user_id ON task
+        BEGIN
+            UPDATE task_stats SET count = count - 1
+            WHERE OLD.user_id IS NOT NULL
+              AND user_id = OLD.user_id
+              AND status = coalesce(OLD.status, '')
+              AND priority = coalesce(OLD.priority, '');
+            INSERT INTO task_stats (user_id, status, priority, count)
+            SELECT NEW.user_id, coalesce(NEW.status, ''),
+                   coalesce(NEW.priority, ''), 1
+            WHERE NEW.user_id IS NOT NULL
+            ON CONFLICT DO UPDATE SET count = count + 1;
+        END
+    """)
+    # Counting whatever was written before the table existed
+    cursor.execute("DELETE FROM task_stats")
+    cursor.execute("""
+        INSERT INTO task_stats (user_id, status, priority, count)
+        SELECT user_id, coalesce(status, ''), coalesce(priority, ''), COUNT(*)
+        FROM task
+        WHERE user_id IS NOT NULL
+        GROUP BY 1, 2, 3
+    """)
+
+
+# Applied in order; PRAGMA user_version records how many already ran
+MIGRATIONS = (
+    _migrate_start_key,
+    _migrate_sort_indexes,
+    _migrate_full_text,
+    _migrate_task_stats,
+)
+
 
 def set_up_db() -> None:
-    
+
     os.makedirs(CONFIG_DIR, exist_ok=True)  # ensuring directory exits
 
     # Create or connect to DB_FILE. This will automatically create the file if it does not exist
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect()
     cursor = conn.cursor()
 
     # Creating tables
@@ -39,10 +193,40 @@ def set_up_db() -> None:
         )
     ''')
 
+    # Bringing older databases up to date
+    version = cursor.execute("PRAGMA user_version").fetchone()[0]
+    for migration in MIGRATIONS[version:]:
+        migration(cursor)
+    cursor.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+
     conn.commit()
     conn.close()
 
 
 def connect() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_FILE)
-    return conn
\ No newline at end of file
+    factory = sqlite3.Connection
+    if TRACE_SQL:
+        from query_trace import TracedConnection
+        factory = TracedConnection
+    conn = sqlite3.connect(DB_FILE, timeout=BUSY_TIMEOUT, factory=factory)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def connection() -> sqlite3.Connection:
+    # The calling thread's connection, opened on first use and reused after
+    # that; sqlite3 connections may not cross threads, so each thread (the GUI
+    # thread, the database worker) gets its own
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = connect()
+    return conn
+
+
+def release() -> None:
+    # Closes the calling thread's connection, if it opened one
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        _local.conn = None
+        conn.close()
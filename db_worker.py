@@ -0,0 +1,115 @@
+from PySide6.QtCore import (
+    QObject, QThread, QMetaObject, Qt, Signal, Slot
+)
+from itertools import count
+from db_setup import connection, release
+from task_repository import TaskRepository
+import sqlite3 as sql
+
+
+class _Worker(QObject):
+    done = Signal(int, object)
+    failed = Signal(int, object)
+
+    def __init__(self, owner):
+        super().__init__()
+        self.owner = owner
+        self.repo = None
+        self.running = None
+
+    @Slot(int, object)
+    def run(self, ticket, job):
+        # Skipping jobs cancelled while they were still queued
+        if ticket not in self.owner.callbacks:
+            return
+        if self.repo is None:
+            # Created lazily so the connection belongs to this thread
+            self.repo = TaskRepository(connection())
+        self.running = ticket
+        try:
+            for attempt in range(2):
+                try:
+                    result = job(self.repo)
+                    break
+                except sql.OperationalError as e:
+                    # An interrupt meant for a previous job can land on this
+                    # one; retry once if nobody cancelled it
+                    if (attempt or "interrupted" not in str(e)
+                            or ticket not in self.owner.callbacks):
+                        raise
+        except Exception as e:
+            self.failed.emit(ticket, e)
+            return
+        finally:
+            self.running = None
+        self.done.emit(ticket, result)
+
+    @Slot()
+    def close(self):
+        if self.repo is not None:
+            release()
+            self.repo = None
+
+
+# Runs repository calls on a dedicated thread that owns its own connection, so
+# the GUI thread never waits on the database. submit(job, callback, failed)
+# queues job(repo) and later calls callback(result) back on the GUI thread,
+# or failed(error) if the job raised; without `failed` the error is printed.
+# cancel() drops both callbacks and interrupts the query if it is already
+# running. Passing the ticket of a finished job queues the new one under it,
+# so a caller retrying from its callback keeps the ticket it handed out.
+# Writes still queued in `commits` are flushed before each job so the
+# worker's connection sees them.
+class DbWorker(QObject):
+    requested = Signal(int, object)
+
+    def __init__(self, commits=None, parent=None):
+        super().__init__(parent)
+        self.commits = commits
+        self.tickets = count(1)
+        self.callbacks = {}
+
+        self.thread = QThread()
+        self.worker = _Worker(self)
+        self.worker.moveToThread(self.thread)
+        self.requested.connect(self.worker.run)
+        self.worker.done.connect(self._on_done)
+        self.worker.failed.connect(self._on_failed)
+        self.thread.start()
+
+    def submit(self, job, callback, failed=None, ticket=None) -> int:
+        if self.commits is not None:
+            self.commits.flush()
+        if ticket is None:
+            ticket = next(self.tickets)
+        self.callbacks[ticket] = (callback, failed)
+        self.requested.emit(ticket, job)
+        return ticket
+
+    def cancel(self, ticket) -> None:
+        if self.callbacks.pop(ticket, None) is None:
+            return
+        if self.worker.running == ticket and self.worker.repo is not None:
+            self.worker.repo.conn.interrupt()
+
+    def stop(self) -> None:
+        for ticket in list(self.callbacks):
+            self.cancel(ticket)
+        QMetaObject.invokeMethod(self.worker, "close",
+                                 Qt.BlockingQueuedConnection)
+        self.thread.quit()
+        self.thread.wait()
+
+    def _on_done(self, ticket, result):
+        callbacks = self.callbacks.pop(ticket, None)
+        if callbacks is not None:
+            callbacks[0](result)
+
+    def _on_failed(self, ticket, error):
+        callbacks = self.callbacks.pop(ticket, None)
+        if callbacks is None:
+            return
+        if callbacks[1] is None:
+            print(error)
+        else:
+            callbacks[1](error)
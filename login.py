@@ -13,17 +13,17 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt, QTimer, QTime, QDate
 from PySide6.QtGui import QFont, QPalette, QColor
-from main_window import Window
+from task_store import TaskStore
 
 
 class Login(QMainWindow):
-    def __init__(self, conn):
+    def __init__(self, repo, db):
         super().__init__()
         self.setFixedSize(300, 300)
         self.setWindowTitle("Mandarina – Task Manager")
         self.main = None
-        self.conn = conn
-        self.cur = self.conn.cursor()
+        self.repo = repo
+        self.db = db
 
         self._render_login()
 
@@ -115,10 +115,7 @@ class Login(QMainWindow):
                 self, "Mandarina 🍊 says: Wait!", "All fields are required")
             return
 
-        query = f"SELECT password FROM user WHERE username = '{username}'"
-        self.cur.execute(query)
-        result = self.cur.fetchone()
-        if result:
+        if self.repo.find_user(username):
             QMessageBox.warning(
                 self, "Mandarina 🍊 says: Uh-oh!", "Username already exists")
             return
@@ -128,9 +125,7 @@ class Login(QMainWindow):
                                 "Password must contain at least 8 characters.")
             return
 
-        insertion = f"INSERT INTO user (username, password) VALUES ('{username}', '{password}')"
-        self.cur.execute(insertion)
-        self.conn.commit()
+        self.repo.add_user(username, password)
         self.login()
 
     def login(self):
@@ -142,9 +137,7 @@ class Login(QMainWindow):
                 self, "Mandarina 🍊 says: Wait!", "All fields are required")
             return
 
-        query = f"SELECT user_id, password FROM user WHERE username = '{username}'"
-        self.cur.execute(query)
-        info = self.cur.fetchone()
+        info = self.repo.find_user(username)
 
         if not info:
             QMessageBox.warning(
@@ -153,7 +146,12 @@ class Login(QMainWindow):
 
         # This must be replaced with an if
         if password == info[1]:
-            win = Window(self.conn, info[0])
+            # Per-user task cache, filled once and kept in sync by every edit
+            store = TaskStore(self.repo, self.db, info[0])
+            store.load()
+            # Usually preloaded by now; imported here for the cases it is not
+            from main_window import Window
+            win = Window(self.repo, store)
             win.show()
             self.close()
         else:
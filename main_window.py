@@ -6,6 +6,7 @@ from PySide6.QtWidgets import (
     QWidget,
     QLabel,
     QComboBox,
+    QStackedWidget,
     QGroupBox,
     QVBoxLayout,
     QHBoxLayout,
@@ -15,119 +16,25 @@ from PySide6.QtWidgets import (
     QTextEdit,
     QDateEdit,
     QTimeEdit,
+    QFileDialog,
+    QMessageBox,
 )
 from PySide6.QtCore import Qt, QTimer, QTime, QDate
-from PySide6.QtGui import QGuiApplication
+from PySide6.QtGui import QGuiApplication, QKeySequence, QShortcut
 import sys
 import os
 import json
-import string
 from pathlib import Path
 from minicalendar import Minicalendar
 from task_panel import TaskPanel
-from tasks_window import TasksWindow
 from calendar_widget import Calendar
-from calendar import Calendar as Cal
-from datetime import datetime
-import sqlite3 as sql
-# Define the path for the hidden directory and JSON file
-CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".mandarina")
-
-
-# Ensure the directory exists
-os.makedirs(CONFIG_DIR, exist_ok=True)
-
-CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
-config = None
-# Default configuration
-DEFAULT_CONFIG = {
-    "palette": "Mandarina",
-    "hour_format": 12,
-    "theme": "light"
-}
-# If the config file doesn't exist, create it with default values
-if not os.path.exists(CONFIG_FILE):
-    with open(CONFIG_FILE, "w") as file:
-        json.dump(DEFAULT_CONFIG, file, indent=4)
-
-# Load the existing configuration
-with open(CONFIG_FILE, "r") as file:
-    config = json.load(file)
-
-PALETTES = {
-    "Mandarina": {
-        "bg": "#ffffff",
-        "fg": "#394d46",
-        "dark_bg": "#2a292d",
-        "dark_fg": "#8bb39a",
-        "accent": "#ff8f1f",
-        "sec_accent": "#1fc271",
-    },
-    "Olive Yards":  {
-        "bg": "#DCD7C9",
-        "fg": "#252220",
-        "dark_bg": "#252220",
-        "dark_fg": "#DCD7C9",
-        "accent": "#5F6F52",
-        "sec_accent": "#A27B5C",
-    },
-    "Peach Dreams": {
-        "bg": "#fff0e1",
-        "fg": "#8c6d88",
-        "dark_bg": "#2b262c",
-        "dark_fg": "#d3adce",
-        "accent": "#f599a6",
-        "sec_accent": "#9ab0a7",
-    },
-    "Eggplant Haze":  {
-        "bg": "#FFF6E0",
-        "fg": "#272829",
-        "dark_bg": "#272829",
-        "dark_fg": "#FFF6E0",
-        "accent": "#727ea2",
-        "sec_accent": "#8b949d",
-    },
-    "Coffee Espresso":  {
-        "bg": "#F8F4E1",
-        "fg": "#543310",
-        "dark_bg": "#1e1b1a",
-        "dark_fg": "#F8F4E1",
-        "accent": "#74512D",
-        "sec_accent": "#AF8F6F",
-    },
-    "Cherry Blossom": {
-        "bg": "#ebe8de",
-        "fg": "#6d303b",
-        "dark_bg": "#2a2627",
-        "dark_fg": "#92b6a4",
-        "accent": "#ff405a",
-        "sec_accent": "#1fb551",
-    },
-    "Blueberry Sparks":  {
-        "bg": "#eeecf9",
-        "fg": "#4a4561",
-        "dark_bg": "#2d2b36",
-        "dark_fg": "#bcb5d8",
-        "accent": "#826fd7",
-        "sec_accent": "#4ea771",
-    },
-    "Grape Fusion":  {
-        "bg": "#f9feff",
-        "fg": "#2D336B",
-        "dark_bg": "#23242e",
-        "dark_fg": "#f9feff",
-        "accent": "#2a48d0",
-        "sec_accent": "#7886C7",
-    },
-    "Lemon Aid":  {
-        "bg": "#fffef8",
-        "fg": "#6a705a",
-        "dark_bg": "#222320",
-        "dark_fg": "#fbfbf3",
-        "accent": "#edd239",
-        "sec_accent": "#acde31",
-    }
-}
+from theme import PALETTES, apply_theme
+from config import config, save as save_config
+from task_io import import_tasks, export_tasks
+from transfer_dialog import TransferDialog
+from db_setup import TRACE_SQL
+from calendar import Calendar as Cal, monthrange
+from datetime import datetime, timedelta
 
 
 class Window(QMainWindow):
@@ -146,17 +53,19 @@ class Window(QMainWindow):
         "December",
     )
 
-    def __init__(self, conn, uid):
+    def __init__(self, repo, store):
         super().__init__()
         screen = QGuiApplication.primaryScreen().geometry()
         screen_width = screen.width()
         screen_height = screen.height()
         self.setFixedSize(screen_width * 0.9, screen_height * 0.9)
 
-        self.conn = conn
+        self.repo = repo
+        self.store = store
+        self.db = store.db
+        self.side_pending = None
         self.task_window = None
-        self.cur = self.conn.cursor()
-        self.user_id = uid
+        self.user_id = store.user_id
 
         self.day = datetime.today().day
         self.month = datetime.today().month
@@ -194,11 +103,26 @@ class Window(QMainWindow):
             self.calendar_views, Qt.AlignLeft)
 
         self.month_txt = QLabel(
-            f"{self.MONTHS[self.cur_date["month"]-1]} {self.cur_date["year"]}")
+            f"{self.MONTHS[self.cur_date['month']-1]} {self.cur_date['year']}")
         self.month_txt.setObjectName("primary")
         self.month_txt.setContentsMargins(20, 0, 20, 0)
         self.header_lay.addWidget(self.month_txt)
 
+        prev_btn = QPushButton("◀")
+        prev_btn.setFixedSize(30, 30)
+        prev_btn.clicked.connect(lambda: self._go(-1))
+        self.header_lay.addWidget(prev_btn)
+
+        today_btn = QPushButton("Today")
+        today_btn.setFixedWidth(60)
+        today_btn.clicked.connect(self._go_today)
+        self.header_lay.addWidget(today_btn)
+
+        next_btn = QPushButton("▶")
+        next_btn.setFixedSize(30, 30)
+        next_btn.clicked.connect(lambda: self._go(1))
+        self.header_lay.addWidget(next_btn)
+
         new_task = QPushButton("✚")
         new_task.setFixedSize(40, 40)
         new_task.setObjectName("roundedBtn")
@@ -209,13 +133,23 @@ class Window(QMainWindow):
         self.header.setLayout(self.header_lay)
         self.left_lay.addWidget(self.header)
 
-        self.calendar = Calendar(self, self.user_id, self.conn)
+        self.calendar = Calendar(self, self.store)
         self.left_lay.addWidget(self.calendar)
 
         footer = QWidget()
         footer.setFixedSize(screen_width * 0.7 - 50, screen_height * 0.1)
         footer_lay = QHBoxLayout()
 
+        import_btn = QPushButton("Import")
+        import_btn.setFixedWidth(80)
+        import_btn.clicked.connect(self._import_tasks)
+        footer_lay.addWidget(import_btn, alignment=Qt.AlignmentFlag.AlignLeft)
+
+        export_btn = QPushButton("Export")
+        export_btn.setFixedWidth(80)
+        export_btn.clicked.connect(self._export_tasks)
+        footer_lay.addWidget(export_btn, alignment=Qt.AlignmentFlag.AlignLeft)
+
         all_tasks = QPushButton("All tasks")
         all_tasks.setFixedWidth(100)
         all_tasks.clicked.connect(self._show_all_tasks)
@@ -234,6 +168,12 @@ class Window(QMainWindow):
         self.timer.timeout.connect(self.update_time)
         self.timer.start(60000)
 
+        # With MANDARINA_TRACE_SQL=1, Ctrl+Shift+Q lists the slowest queries
+        self.query_panel = None
+        if TRACE_SQL:
+            QShortcut(QKeySequence("Ctrl+Shift+Q"), self,
+                      self._show_query_panel)
+
         self.letf_container.setLayout(self.left_lay)
         self.main_lay.addWidget(self.letf_container)
 
@@ -241,6 +181,18 @@ class Window(QMainWindow):
         self.right_container.setFixedWidth(285)
         self.right_lay = QVBoxLayout()
 
+        # Side panels are built once and stacked; _render_side_bar rebinds
+        # the requested one and raises it
+        self.side_stack = QStackedWidget()
+        self.right_lay.addWidget(self.side_stack)
+        self.task_panels = {}
+        self.side_panels = {
+            "settings": self._render_settings_panel(),
+            "": self._render_side_panel(),
+        }
+        for kind in ("task info", "task edit", "task insertion"):
+            self.side_panels[kind] = self._render_task(kind)
+        self.store.changed.connect(self._on_task_changed)
         self._render_side_bar("", 0)
 
         self.right_container.setLayout(self.right_lay)
@@ -249,18 +201,77 @@ class Window(QMainWindow):
         self.main.setLayout(self.main_lay)
         self.setCentralWidget(self.main)
 
-        self._apply_changes()
+        # app.py already applied the saved theme; only the settings panel
+        # needs to reflect it. config.json is written on Apply alone.
+        self._bind_settings_panel()
 
     def _show_all_tasks(self):
         theme = 'dark' if self.dark_mode else 'light'
         if self.task_window is None:
+            # Loaded on first use; it pulls in QtCharts
+            from tasks_window import TasksWindow
             self.task_window = TasksWindow(
-                self, self.conn, self.user_id, PALETTES[self.selected_palette], theme)
+                self, self.db, self.user_id, PALETTES[self.selected_palette], theme)
             self.task_window.show()
         else:
             self.task_window.close()
             self.task_window = None
 
+    def _show_query_panel(self):
+        if self.query_panel is None:
+            from query_panel import QueryPanel
+            self.query_panel = QueryPanel(self)
+        self.query_panel.show()
+        self.query_panel.raise_()
+
+    def _import_tasks(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import tasks", "", "Tasks (*.csv *.jsonl *.ics)")
+        if not path:
+            return
+        user_id = self.user_id
+        TransferDialog(self, self.db, "Importing tasks…").run(
+            lambda repo, progress: import_tasks(repo, user_id, path, progress),
+            "Imported", self._on_imported)
+
+    def _on_imported(self, result):
+        # Cached months and counts predate the import, even a failed one:
+        # the chunks before the failure are already committed
+        self.store.invalidate()
+        self.mini_calendar.refresh()
+        self._render_view()
+        self._render_side_bar("", 0)
+        if isinstance(result, Exception):
+            QMessageBox.warning(self, "Mandarina 🍊 says: Uh-oh!",
+                                f"The file could not be imported.\n{result}")
+            return
+        imported, skipped = result
+        message = f"Imported {imported} tasks."
+        if skipped:
+            message += f"\n{skipped} records were not tasks with a title and a date and were skipped."
+        QMessageBox.information(self, "Mandarina 🍊", message)
+
+    def _export_tasks(self):
+        path, chosen = QFileDialog.getSaveFileName(
+            self, "Export tasks", "tasks.csv",
+            "CSV (*.csv);;JSON Lines (*.jsonl);;iCalendar (*.ics)")
+        if not path:
+            return
+        extension = chosen[chosen.index("*") + 1:-1] if "*" in chosen else ".csv"
+        if not path.lower().endswith((".csv", ".jsonl", ".ics")):
+            path += extension
+        user_id = self.user_id
+        TransferDialog(self, self.db, "Exporting tasks…").run(
+            lambda repo, progress: export_tasks(repo, user_id, path, progress),
+            "Exported", self._on_exported)
+
+    def _on_exported(self, result):
+        if isinstance(result, Exception):
+            QMessageBox.warning(self, "Mandarina 🍊 says: Uh-oh!",
+                                f"The tasks could not be exported.\n{result}")
+            return
+        QMessageBox.information(self, "Mandarina 🍊", f"Exported {result} tasks.")
+
     def _render_view(self):
         match self.calendar_views.currentText():
             case "day":
@@ -268,20 +279,48 @@ class Window(QMainWindow):
                                               self.cur_date["day"],
                                               self.cur_date["year"])
             case "month":
-                self.cur_date["day"] = datetime.today(
-                ).day
-                self.cur_date["month"] = datetime.today().month
                 self.calendar.render_month_view(self.cur_date["month"],
                                                 self.cur_date["day"],
                                                 self.cur_date["year"])
             case "week":
-                self.cur_date["day"] = datetime.today().day
-                self.cur_date["month"] = datetime.today().month
                 self.calendar.render_week_view(self.cur_date["month"],
                                                self.cur_date["day"],
                                                self.cur_date["year"])
         self.month_txt.setText(
-            f"{self.MONTHS[self.cur_date["month"]-1]} {self.cur_date["year"]}")
+            f"{self.MONTHS[self.cur_date['month']-1]} {self.cur_date['year']}")
+
+    def _go(self, step: int):
+        # Moves cur_date one day, week or month, as the view shows
+        current = datetime(self.cur_date["year"], self.cur_date["month"],
+                           self.cur_date["day"])
+        match self.calendar_views.currentText():
+            case "day":
+                current += timedelta(days=step)
+            case "week":
+                current += timedelta(weeks=step)
+            case "month":
+                year, month = divmod(
+                    current.year * 12 + current.month - 1 + step, 12)
+                month += 1
+                current = datetime(year, month, min(
+                    current.day, monthrange(year, month)[1]))
+        self.cur_date["day"] = current.day
+        self.cur_date["month"] = current.month
+        self.cur_date["year"] = current.year
+        self._render_view()
+
+    def _go_today(self):
+        self._reset_current_date()
+        self._render_view()
+
+    def _open_day(self, date):
+        self.cur_date["day"] = date.day
+        self.cur_date["month"] = date.month
+        self.cur_date["year"] = date.year
+        if self.calendar_views.currentText() == "day":
+            self._render_view()
+        else:
+            self.calendar_views.setCurrentText("day")
 
     def update_time(self):
         if self.day != datetime.today().day:
@@ -297,16 +336,22 @@ class Window(QMainWindow):
         self.cur_date["year"] = self.year = datetime.today().year
 
     def _render_side_bar(self, sidebar_type, task_id):
-        panel = self.right_container.findChild(QWidget, "panel")
-        if panel:
-            self.right_lay.removeWidget(panel)
-            panel.deleteLater()
+        if self.side_pending is not None:
+            self.db.cancel(self.side_pending)
+            self.side_pending = None
         if sidebar_type == "settings":
-            self._render_settings_panel()
+            self._bind_settings_panel()
         elif "task" in sidebar_type:
-            self._render_task(sidebar_type, task_id)
+            self.task_panels[sidebar_type].bind(task_id)
         else:
-            self._render_side_panel()
+            sidebar_type = ""
+            self._bind_side_panel()
+        self.side_stack.setCurrentWidget(self.side_panels[sidebar_type])
+
+    def _on_task_changed(self, change):
+        # Keeps "Scheduled Today" current when it is the panel on show
+        if self.side_stack.currentWidget() is self.side_panels[""]:
+            self._bind_side_panel()
 
     def _render_settings_panel(self):
         panel = QWidget()
@@ -319,6 +364,7 @@ class Window(QMainWindow):
         scroll_container = QWidget()
         scroll_container.setLayout(QVBoxLayout())
         self.themes = QButtonGroup(scroll_container)
+        self.swatches = []  # (swatch, shown in dark mode)
 
         for name, colors in PALETTES.items():
             container = QGroupBox()
@@ -328,8 +374,6 @@ class Window(QMainWindow):
             # Radio button to select the palette
             radio = QRadioButton()
             radio.setText(name)
-            # Default selection
-            radio.setChecked(name == self.selected_palette)
             radio.toggled.connect(
                 self._on_palette_selected)  # Connect signal
             self.themes.addButton(radio)  # Add to button group
@@ -338,13 +382,12 @@ class Window(QMainWindow):
             color_container = QWidget()
             color_container.setLayout(QHBoxLayout())
             # Color preview
+            # Both modes' swatches are made up front; binding shows one set
             for attr, clr in colors.items():
+                in_dark = "dark" in attr or attr not in ("fg", "bg")
+                in_light = "dark" not in attr
                 color = QLabel()
-                if "dark" in attr and not self.dark_mode:
-                    continue
-                if "dark" not in attr and self.dark_mode:
-                    if attr == "fg" or attr == "bg":
-                        continue
+                self.swatches.append((color, in_dark, in_light))
 
                 color.setFixedSize(25, 25)
                 color.setStyleSheet(f"""
@@ -361,10 +404,8 @@ class Window(QMainWindow):
         scrollable.setWidget(scroll_container)
         layout.addWidget(scrollable)
 
-        self.theme_toggle = QPushButton(
-            "Dark Mode" if self.dark_mode else "Light Mode")  # Default to light mode
+        self.theme_toggle = QPushButton()
         self.theme_toggle.setCheckable(True)
-        self.theme_toggle.setChecked(self.dark_mode)  # Default to light mode
         self.theme_toggle.clicked.connect(self._switch_theme)
         layout.addWidget(self.theme_toggle)
 
@@ -385,7 +426,18 @@ class Window(QMainWindow):
 
         layout.addWidget(btn_container)
         panel.setLayout(layout)
-        self.right_lay.addWidget(panel)
+        self.side_stack.addWidget(panel)
+        return panel
+
+    def _bind_settings_panel(self):
+        for radio in self.themes.buttons():
+            # Default selection
+            radio.setChecked(radio.text() == self.selected_palette)
+        for color, in_dark, in_light in self.swatches:
+            color.setVisible(in_dark if self.dark_mode else in_light)
+        self.theme_toggle.setText(
+            "Dark Mode" if self.dark_mode else "Light Mode")
+        self.theme_toggle.setChecked(self.dark_mode)
 
     def _switch_theme(self):
         self.dark_mode = self.theme_toggle.isChecked()
@@ -402,24 +454,15 @@ class Window(QMainWindow):
         if self.selected_palette not in PALETTES:
             return
 
-        palette = PALETTES[self.selected_palette]
-
         config["palette"] = self.selected_palette
         # Toggle between dark and light mode
         config["theme"] = "dark" if self.dark_mode else "light"
 
-        # Load and apply the correct stylesheet
-        theme_file = "dark_theme.qss" if self.dark_mode else "light_theme.qss"
-        with open(theme_file, "r") as file:
-            # Use Template instead of format
-            qss_template = string.Template(file.read())
-
-        qss = qss_template.safe_substitute(palette)
-        self.setStyleSheet(qss)
+        # Compiled once per palette/theme and set on the whole application
+        apply_theme(config["palette"], config["theme"])
 
         # Save updated theme to JSON
-        with open(CONFIG_FILE, "w") as file:
-            json.dump(config, file, indent=4)
+        save_config()
 
         self._render_side_bar("", 0)
 
@@ -430,10 +473,9 @@ class Window(QMainWindow):
         panel.setFixedWidth(270)
         layout = QVBoxLayout()
 
-        date_hdr = QLabel(
-            f"{self.MONTHS[self.cur_date['month']-1]} {self.cur_date['day']}")
-        date_hdr.setObjectName("primary")
-        layout.addWidget(date_hdr)
+        self.date_hdr = QLabel()
+        self.date_hdr.setObjectName("primary")
+        layout.addWidget(self.date_hdr)
 
         hdr = QLabel("Scheduled Today")
         hdr.setObjectName("secondary")
@@ -442,46 +484,83 @@ class Window(QMainWindow):
         scheduled_tasks = QScrollArea()
         scheduled_tasks.setObjectName("sched_today")
         container = QWidget()
-        container_lay = QVBoxLayout()
-        # logic for showing tasks
-        query = f"""SELECT task_name, date, content, priority, status FROM task 
-                    WHERE strftime('%m', date) = '{self.cur_date['month']:02d}'
-                    AND strftime('%d', date) = '{self.cur_date['day']:02d}'
-                    AND strftime('%Y', date) = '{self.cur_date['year']}'
-                    AND user_id = '{self.user_id}'"""
-        self.cur.execute(query)
-        tasks = self.cur.fetchall()
-        for task in tasks:
-            w = QWidget()
-            w.setLayout(QVBoxLayout())
-            w.setObjectName("filled")
-            for field in task:
-                l = QLabel(field)
-                l.setObjectName("filled")
-                l.setFixedWidth(200)
-                l.setWordWrap(True)
-                w.layout().addWidget(l)
-            container_lay.addWidget(w)
-        container.setLayout(container_lay)
+        self.sched_lay = QVBoxLayout()
+        self.sched_loading = QLabel("Loading tasks…")
+        self.sched_lay.addWidget(self.sched_loading)
+        self.sched_items = []  # reused task cards: (card, field labels)
+        container.setLayout(self.sched_lay)
         scheduled_tasks.setWidget(container)
+        scheduled_tasks.setWidgetResizable(True)
 
         layout.addWidget(scheduled_tasks)
 
-        self.mini_calendar = Minicalendar()
+        self.mini_calendar = Minicalendar(self.store)
         layout.addWidget(self.mini_calendar)
 
         panel.setLayout(layout)
-        self.right_lay.addWidget(panel)
+        self.side_stack.addWidget(panel)
+        return panel
 
-    def _render_task(self, widget_type, id):
+    def _on_side_failed(self, error):
+        self.side_pending = None
+        self.sched_loading.setText(f"Tasks could not be loaded.\n{error}")
+
+    def _bind_side_panel(self):
+        self.date_hdr.setText(
+            f"{self.MONTHS[self.cur_date['month']-1]} {self.cur_date['day']}")
+        # logic for showing tasks
+        today = datetime(self.cur_date['year'],
+                         self.cur_date['month'], self.cur_date['day'])
+        tomorrow = today + timedelta(days=1)
+        if self.store.has_range(today, tomorrow):
+            tasks = self.store.tasks_on(today)
+            self.sched_loading.hide()
+        else:
+            # Placeholder until the database worker brings the day in
+            tasks = []
+            self.sched_loading.setText("Loading tasks…")
+            self.sched_loading.show()
+            self.side_pending = self.store.load_async(
+                today, tomorrow, lambda: self._render_side_bar("", 0),
+                self._on_side_failed)
+
+        # Cards are only created when a day has more tasks than any before
+        while len(self.sched_items) < len(tasks):
+            w = QWidget()
+            w.setLayout(QVBoxLayout())
+            w.setObjectName("filled")
+            labels = []
+            for _ in range(5):
+                l = QLabel()
+                l.setObjectName("filled")
+                l.setFixedWidth(200)
+                l.setWordWrap(True)
+                w.layout().addWidget(l)
+                labels.append(l)
+            self.sched_lay.addWidget(w)
+            self.sched_items.append((w, labels))
+        for i, (w, labels) in enumerate(self.sched_items):
+            if i >= len(tasks):
+                w.hide()
+                continue
+            task = tasks[i]
+            for l, field in zip(labels, (task.task_name, task.date,
+                                         task.content, task.priority,
+                                         task.status)):
+                l.setText(field)
+            w.show()
+
+    def _render_task(self, widget_type):
         panel = QWidget()
         panel.setContentsMargins(-20, 0, -20, 0)
         panel.setObjectName("panel")
         panel.setFixedWidth(270)
         layout = QVBoxLayout()
 
-        layout.addWidget(
-            TaskPanel(self, widget_type, self.conn, self.user_id, id))
+        task_panel = TaskPanel(self, widget_type, self.store)
+        self.task_panels[widget_type] = task_panel
+        layout.addWidget(task_panel)
 
         panel.setLayout(layout)
-        self.right_lay.addWidget(panel)
+        self.side_stack.addWidget(panel)
+        return panel
@@ -1,31 +1,163 @@
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QScrollArea, QLabel, QGridLayout, QGroupBox,
-    QPushButton, QMainWindow, QHBoxLayout, QApplication, QGraphicsOpacityEffect
+    QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, QToolTip,
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QRect, QEvent
+from PySide6.QtGui import QPainter, QPixmap, QColor, QFont
+from collections import OrderedDict
 from datetime import datetime
 from calendar import Calendar as Cal
+from calendar_grid import CalendarGrid
+
+# Tasks per day for recently shown months, keyed (user, year, month). Each
+# month costs one GROUP BY query on the database worker; task changes move
+# their count between days in place and imports clear the user's months.
+_density = OrderedDict()
+MAX_DENSITY_MONTHS = 36
+
+
+def _month_bounds(year: int, month: int) -> tuple:
+    next_year, next_month = (year, month + 1) if month < 12 else (year + 1, 1)
+    return f"{year}-{month:02d}-01", f"{next_year}-{next_month:02d}-01"
+
+
+# Painted month: weekday initials, day numbers, today's marker and a shade
+# behind every day that grows darker the more tasks it holds. A finished
+# month is kept as a pixmap, so paging back to it only blits that pixmap.
+class MiniMonth(CalendarGrid):
+    DAYS = ('S', 'M', 'T', 'W', 'T', 'F', 'S')
+    MAX_RENDERS = 12
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.year = datetime.today().year
+        self.month = datetime.today().month
+        self.counts = {}
+        self.renders = OrderedDict()  # signature -> QPixmap
+
+    def set_month(self, year: int, month: int, counts: dict) -> None:
+        self.year = year
+        self.month = month
+        self.counts = counts
+        self.update()
+
+    def _day_at(self, pos) -> int:
+        col = int(pos.x() * 7 // max(self.width(), 1))
+        row = int(pos.y() * 7 // max(self.height(), 1)) - 1
+        weeks = Cal(firstweekday=6).monthdayscalendar(self.year, self.month)
+        if 0 <= row < len(weeks) and 0 <= col < 7:
+            return weeks[row][col]
+        return 0
+
+    def event(self, event) -> bool:
+        if event.type() == QEvent.ToolTip:
+            day = self._day_at(event.pos())
+            count = self.counts.get(
+                f"{self.year}-{self.month:02d}-{day:02d}", 0)
+            if day and count:
+                QToolTip.showText(event.globalPos(),
+                                  f"{count} task{'s' if count > 1 else ''}",
+                                  self)
+            else:
+                QToolTip.hideText()
+                event.ignore()
+            return True
+        return super().event(event)
+
+    def _signature(self) -> tuple:
+        # Everything a render depends on; any change makes a new pixmap
+        return (self.year, self.month, datetime.today().date(),
+                tuple(sorted(self.counts.items())), self.size().toTuple(),
+                self._accent.rgba(), self._sec_accent.rgba(), self._fg().rgba())
+
+    def paintEvent(self, event) -> None:
+        signature = self._signature()
+        pixmap = self.renders.get(signature)
+        if pixmap is None:
+            pixmap = self._render()
+            self.renders[signature] = pixmap
+            if len(self.renders) > self.MAX_RENDERS:
+                self.renders.popitem(last=False)
+        else:
+            self.renders.move_to_end(signature)
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, pixmap)
+        painter.end()
+
+    def _render(self) -> QPixmap:
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(self.size() * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        col_w = self.width() / 7
+        row_h = self.height() / 7
+        bold = QFont(self.font())
+        bold.setBold(True)
+
+        painter.setFont(bold)
+        painter.setPen(self._accent)
+        for col, day in enumerate(self.DAYS):
+            painter.setOpacity(0.5 if col in (0, 6) else 1)
+            painter.setPen(self._accent if col in (0, 6) else self._fg())
+            painter.drawText(QRect(int(col * col_w), 0, int(col_w), int(row_h)),
+                             Qt.AlignCenter, day)
+        painter.setOpacity(1)
+
+        today = datetime.today()
+        busiest = max(self.counts.values(), default=0)
+        days = Cal(firstweekday=6).monthdayscalendar(self.year, self.month)
+        for row, week in enumerate(days, start=1):
+            for col, day in enumerate(week):
+                if day == 0:
+                    continue
+                cell = QRect(int(col * col_w), int(row * row_h),
+                             int(col_w), int(row_h)).adjusted(2, 2, -2, -2)
+                count = self.counts.get(
+                    f"{self.year}-{self.month:02d}-{day:02d}", 0)
+                is_today = (self.year, self.month, day) == (
+                    today.year, today.month, today.day)
+
+                if is_today:
+                    painter.setPen(Qt.NoPen)
+                    painter.setBrush(self._accent)
+                    painter.drawRoundedRect(cell, 10, 10)
+                elif count:
+                    shade = QColor(self._sec_accent)
+                    shade.setAlphaF(0.15 + 0.6 * count / busiest)
+                    painter.setPen(Qt.NoPen)
+                    painter.setBrush(shade)
+                    painter.drawRoundedRect(cell, 10, 10)
+
+                weekend = col in (0, 6)
+                painter.setFont(bold if is_today or weekend else self.font())
+                if is_today:
+                    painter.setPen(QColor("#ffffff"))
+                elif weekend:
+                    painter.setOpacity(0.7)
+                    painter.setPen(self._accent)
+                else:
+                    painter.setPen(self._fg())
+                painter.drawText(cell, Qt.AlignCenter, str(day))
+                painter.setOpacity(1)
+        painter.end()
+        return pixmap
 
 
 class Minicalendar(QWidget):
-    __DAYS = (
-        'S',
-        'M',
-        'T',
-        'W',
-        'T',
-        'F',
-        'S',
-    )
     __MONTHS = (
         "January", "February", "March", "April",
         "May", "June", "July", "August",
-        "October", "September", "November", "December"
+        "September", "October", "November", "December"
     )
 
-    def __init__(self):
+    def __init__(self, store):
         super().__init__()
 
+        self.store = store
+        self.pending = None  # database worker ticket for the shown month
+        self.loading = None  # _density key that ticket will fill
         self.curdate = {
             'day': datetime.today().day,
             'month': datetime.today().month,
@@ -62,68 +194,94 @@ class Minicalendar(QWidget):
         header.setLayout(header_lay)
         self.main_lay.addWidget(header)
 
-        self.calendar = None
+        self.calendar = MiniMonth()
+        self.calendar.setObjectName("minical")
+        self.calendar.setFixedHeight(200)
+        self.main_lay.addWidget(self.calendar)
+        self.store.changed.connect(self._on_task_changed)
         self._render_calendar(self.curdate['month'],
                               self.curdate['year'])
 
         self.setLayout(self.main_lay)
 
     def _render_calendar(self, month, year):
-        if self.calendar:
-            self.main_lay.removeWidget(self.calendar)
-            self.calendar.deleteLater()
-            self.calendar = None
-
         self.month.setText(
             f"{self.__MONTHS[self.curdate['month']-1]} {self.curdate['year']}")
-        self.calendar = QWidget()
-        self.calendar.setObjectName("minical")
-        self.calendar.setFixedHeight(200)
-        layout = QGridLayout()
-        layout.setSpacing(0)
-
-        col = 0
-        for day in self.__DAYS:
-            label = QLabel(day)
-            if day == 'S':
-                label.setObjectName("accented")
-                opacity_effect = QGraphicsOpacityEffect()
-                label.setGraphicsEffect(opacity_effect)
-                label.graphicsEffect().setProperty("opacity", 0.5)
-            layout.addWidget(label, 0, col, alignment=Qt.AlignCenter)
-            col += 1
-
-        cal = Cal()
-        cal.setfirstweekday(6)
-        row = 1
-        col = 0
-        for i in cal.itermonthdays(year, month):
-            if col == 7:
-                row += 1
-                col = 0
-            if i == 0:
-                col += 1
-                continue
+        self.month.setToolTip("")
+        if self.pending is not None:
+            self.store.db.cancel(self.pending)
+            self.pending = self.loading = None
 
-            label = QLabel(f"{'' if i == 0 else i}")
-            if col == 0 or col == 6:
-                label.setObjectName("accented")
-                opacity_effect = QGraphicsOpacityEffect()
-                label.setGraphicsEffect(opacity_effect)
-                label.graphicsEffect().setProperty("opacity", 0.7)
-            if (i == datetime.today().day and datetime.today().month == self.curdate['month']
-                    and datetime.today().year == self.curdate['year']):
-                label.setObjectName("dayLabel")
-            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            layout.addWidget(label, row, col)
-            col += 1
-
-        self.calendar.setLayout(layout)
-        self.main_lay.addWidget(self.calendar)
+        key = (self.store.user_id, year, month)
+        counts = _density.get(key)
+        if counts is not None:
+            _density.move_to_end(key)
+            self.calendar.set_month(year, month, counts)
+            return
+
+        # Bare numbers until the counts arrive
+        self.calendar.set_month(year, month, {})
+        first, last = _month_bounds(year, month)
+        user_id = self.store.user_id
+
+        def loaded(counts):
+            self.pending = self.loading = None
+            _density[key] = counts
+            if len(_density) > MAX_DENSITY_MONTHS:
+                _density.popitem(last=False)
+            if (self.calendar.year, self.calendar.month) == (year, month):
+                self.calendar.set_month(year, month, counts)
+
+        def failed(error):
+            # The days stay unshaded; the header says why
+            self.pending = self.loading = None
+            self.month.setToolTip(f"Task counts could not be loaded.\n{error}")
+
+        self.loading = key
+        self.pending = self.store.db.submit(
+            lambda repo: repo.count_by_day(user_id, first, last), loaded,
+            failed)
+
+    def refresh(self):
+        # Drops this user's cached counts, for changes made behind the
+        # store's back such as an import
+        for key in [key for key in _density if key[0] == self.store.user_id]:
+            del _density[key]
+        self._render_calendar(self.curdate['month'], self.curdate['year'])
+
+    def _on_task_changed(self, change):
+        # Moves the task's count from the day it left to the day it entered.
+        # Months that are not cached are counted when next shown; a month
+        # whose counts are still being read is read again, as the answer may
+        # predate the change.
+        old = change.old[0] if change.old is not None else None
+        new = change.new[0] if change.new is not None else None
+        if old == new:
+            return
+        reload = False
+        for day, step in ((old, -1), (new, 1)):
+            if day is None:
+                continue
+            key = (self.store.user_id, int(day[:4]), int(day[5:7]))
+            if key == self.loading:
+                reload = True
+                continue
+            counts = _density.get(key)
+            if counts is None:
+                continue
+            count = counts.get(day, 0) + step
+            if count > 0:
+                counts[day] = count
+            else:
+                counts.pop(day, None)
+            if counts is self.calendar.counts:
+                self.calendar.update()
+        if reload:
+            self._render_calendar(self.curdate['month'], self.curdate['year'])
 
     def _go_next(self):
         self.curdate['month'] += 1
-        if self.curdate['month'] >= 12:
+        if self.curdate['month'] > 12:
             self.curdate['year'] += 1
             self.curdate['month'] = 1
         self._render_calendar(self.curdate['month'],
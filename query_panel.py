@@ -0,0 +1,85 @@
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QPushButton, QLabel, QHeaderView
+)
+from PySide6.QtCore import Qt, QTimer
+import query_trace
+
+
+# Debug window listing the statements in the trace buffer by total time, so
+# a statement run once per day or per row stands out by its call count.
+# Refreshed every second while it is open.
+class QueryPanel(QWidget):
+    COLUMNS = ("Statement", "Calls", "Total ms", "Mean ms", "Max ms", "Rows",
+               "Call sites")
+
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.setWindowTitle("Mandarina 🍊 queries")
+        self.resize(1000, 500)
+
+        lay = QVBoxLayout()
+        self.summary = QLabel()
+        self.summary.setObjectName("secondary")
+        lay.addWidget(self.summary)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.verticalHeader().hide()
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(0, QHeaderView.Interactive)
+        header.setStretchLastSection(True)
+        self.table.setColumnWidth(0, 480)
+        lay.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        clear = QPushButton("Clear")
+        clear.clicked.connect(self._clear)
+        buttons.addWidget(clear, alignment=Qt.AlignLeft)
+        lay.addLayout(buttons)
+        self.setLayout(lay)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+
+    def refresh(self):
+        stats = query_trace.top()
+        records = len(query_trace.records())
+        self.summary.setText(
+            f"{records} statements in the buffer (last "
+            f"{query_trace.BUFFER_SIZE} kept), top {len(stats)} by total time")
+
+        self.table.setRowCount(len(stats))
+        for row, entry in enumerate(stats):
+            sites = sorted(entry.sites.items(), key=lambda s: s[1], reverse=True)
+            values = (
+                entry.text,
+                entry.calls,
+                f"{entry.total * 1000:.2f}",
+                f"{entry.total * 1000 / entry.calls:.2f}",
+                f"{entry.slowest * 1000:.2f}",
+                entry.rows,
+                ", ".join(f"{site} ×{calls}" for site, calls in sites),
+            )
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(str(value))
+                item.setToolTip(str(value))
+                if col in (1, 2, 3, 4, 5):
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, col, item)
+
+    def _clear(self):
+        query_trace.clear()
+        self.refresh()
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
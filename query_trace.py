@@ -0,0 +1,250 @@
+import sqlite3
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from db_setup import CONFIG_DIR
+
+# Statements slower than this many milliseconds are appended to SLOW_LOG;
+# unset or 0 keeps the log off
+SLOW_MS = float(os.environ.get("MANDARINA_SLOW_QUERY_MS") or 0)
+SLOW_LOG = os.path.join(CONFIG_DIR, "slow_queries.log")
+BUFFER_SIZE = 5000
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+_SKIPPED_FILES = {os.path.basename(__file__), "task_repository.py"}
+
+_lock = threading.Lock()
+_buffer = deque(maxlen=BUFFER_SIZE)  # most recent StatementRecords
+
+
+def normalize(sql: str) -> str:
+    # Same text for every run of a statement, whatever values it was bound to
+    return _SPACES.sub(" ", _LITERALS.sub("?", sql)).strip()
+
+
+def _call_site() -> str:
+    # First frame outside the tracing and the repository: the code that
+    # asked for the data, which is where an N+1 loop would live
+    frame = sys._getframe(2)
+    while frame is not None:
+        name = os.path.basename(frame.f_code.co_filename)
+        if name not in _SKIPPED_FILES:
+            return f"{name}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+# One statement SQLite ran. duration (seconds) and rows are filled in for the
+# statements the code asked for; the ones SQLite ran on their behalf (the
+# implicit BEGIN, FTS5 bookkeeping inside triggers) keep None, as their time
+# is already part of the statement that caused them.
+class StatementRecord:
+    __slots__ = ("text", "site", "thread", "at", "duration", "rows")
+
+    def __init__(self, text: str, site: str):
+        self.text = text
+        self.site = site
+        self.thread = threading.current_thread().name
+        self.at = time.time()
+        self.duration = None
+        self.rows = None
+
+
+# Totals of one normalized statement over the buffer
+class StatementStats:
+    __slots__ = ("text", "calls", "total", "slowest", "rows", "sites")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.calls = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.rows = 0
+        self.sites = {}  # call site -> calls
+
+
+def records() -> list:
+    with _lock:
+        return list(_buffer)
+
+
+def clear() -> None:
+    with _lock:
+        _buffer.clear()
+
+
+def top(limit: int = 50) -> list:
+    # StatementStats of the statements with the highest total time
+    stats = {}
+    for record in records():
+        entry = stats.get(record.text)
+        if entry is None:
+            entry = stats[record.text] = StatementStats(record.text)
+        entry.calls += 1
+        entry.total += record.duration or 0
+        entry.slowest = max(entry.slowest, record.duration or 0)
+        entry.rows += max(record.rows or 0, 0)
+        entry.sites[record.site] = entry.sites.get(record.site, 0) + 1
+    return sorted(stats.values(), key=lambda s: s.total, reverse=True)[:limit]
+
+
+def _log_slow(record: StatementRecord) -> None:
+    try:
+        with open(SLOW_LOG, "a") as file:
+            file.write(
+                f"{datetime.fromtimestamp(record.at):%Y-%m-%d %H:%M:%S} "
+                f"{record.duration * 1000:8.1f} ms {record.rows:6} rows "
+                f"[{record.thread}] {record.site}: {record.text}\n")
+    except OSError as e:
+        print(e)
+
+
+def _attribute(started: list, sql: str, elapsed: float) -> list:
+    # The records of the statement the caller ran, told apart from the ones
+    # SQLite ran on its behalf by their text; executemany runs it once per
+    # parameter set and the time is split between the runs
+    text = normalize(sql)
+    runs = [r for r in started if r.text == text]
+    if not runs:
+        runs = [r for r in started if r.text != "BEGIN"][:1]
+    for record in runs:
+        record.duration = elapsed / len(runs)
+        record.rows = 0
+    return runs
+
+
+def _finish(record: StatementRecord) -> None:
+    if SLOW_MS and record.duration * 1000 >= SLOW_MS:
+        _log_slow(record)
+
+
+# Connection whose statements are all recorded. SQLite reports each statement
+# it starts through the trace callback, including the BEGIN/COMMIT the sqlite3
+# module issues on its own; cursors then time the statements they ran, from
+# execute until the last row is fetched. Used by db_setup.connect when
+# MANDARINA_TRACE_SQL=1.
+class TracedConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.started = []  # records traced since the last take()
+        self.seen = set()  # their statement text, as SQLite reported it
+        self.set_trace_callback(self._on_statement)
+
+    def _on_statement(self, sql: str) -> None:
+        # Every trigger program a statement fires is reported again with the
+        # statement's own text; those are part of the statement, not new ones
+        if sql.startswith("--") or sql in self.seen:
+            return
+        self.seen.add(sql)
+        record = StatementRecord(normalize(sql), _call_site())
+        self.started.append(record)
+        with _lock:
+            _buffer.append(record)
+
+    def take(self) -> list:
+        started, self.started = self.started, []
+        self.seen.clear()
+        return started
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or TracedCursor)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, parameters):
+        return self.cursor().executemany(sql, parameters)
+
+    def commit(self) -> None:
+        self.take()
+        start = time.perf_counter()
+        super().commit()
+        for record in _attribute(self.take(), "COMMIT",
+                                 time.perf_counter() - start):
+            _finish(record)
+
+
+class TracedCursor(sqlite3.Cursor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.record = None  # statement whose rows are still being fetched
+
+    def _run(self, method, sql, parameters):
+        self._done()
+        self.connection.take()
+        start = time.perf_counter()
+        try:
+            method(self, sql, parameters)
+        finally:
+            runs = _attribute(self.connection.take(), sql,
+                              time.perf_counter() - start)
+        if runs and self.description is not None:
+            self.record = runs[-1]  # a query; fetching adds to it
+            return self
+        if runs:
+            runs[-1].rows = max(self.rowcount, 0)
+        for record in runs:
+            _finish(record)
+        return self
+
+    def _done(self) -> None:
+        if self.record is not None:
+            record, self.record = self.record, None
+            _finish(record)
+
+    def _timed(self, fetch, *args):
+        start = time.perf_counter()
+        rows = fetch(self, *args)
+        if self.record is not None:
+            self.record.duration += time.perf_counter() - start
+        return rows
+
+    def _fetched(self, count: int, exhausted: bool) -> None:
+        if self.record is not None:
+            self.record.rows += count
+            if exhausted:
+                self._done()
+
+    def execute(self, sql, parameters=()):
+        return self._run(sqlite3.Cursor.execute, sql, parameters)
+
+    def executemany(self, sql, parameters):
+        return self._run(sqlite3.Cursor.executemany, sql, parameters)
+
+    def fetchone(self):
+        row = self._timed(sqlite3.Cursor.fetchone)
+        self._fetched(row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(sqlite3.Cursor.fetchmany,
+                           self.arraysize if size is None else size)
+        self._fetched(len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(sqlite3.Cursor.fetchall)
+        self._fetched(len(rows), True)
+        return rows
+
+    def __next__(self):
+        try:
+            row = self._timed(sqlite3.Cursor.__next__)
+        except StopIteration:
+            self._done()
+            raise
+        self._fetched(1, False)
+        return row
+
+    def close(self) -> None:
+        self._done()
+        super().close()
+
+    def __del__(self):
+        if getattr(self, "record", None) is not None:
+            self._done()
@@ -0,0 +1,43 @@
+from PySide6.QtCore import QTimer
+import os
+import sys
+import time
+import importlib
+
+# Set MANDARINA_STARTUP_REPORT=1 to print where launch time goes
+ENABLED = os.environ.get("MANDARINA_STARTUP_REPORT") == "1"
+
+_start = time.perf_counter()
+_marks = []  # (label, seconds since start)
+
+
+def mark(label: str) -> None:
+    _marks.append((label, time.perf_counter() - _start))
+
+
+def report() -> None:
+    if not ENABLED:
+        return
+    print("Startup timing (ms):", file=sys.stderr)
+    last = 0.0
+    for label, at in _marks:
+        print(f"  {at * 1000:8.1f}  +{(at - last) * 1000:7.1f}  {label}",
+              file=sys.stderr)
+        last = at
+
+
+def preload(modules: list, done=None) -> None:
+    # Imports the given modules one per event loop turn once the loop is
+    # idle, so the login window paints first and stays responsive while the
+    # heavy parts of the app load behind it
+    def step():
+        if not modules:
+            if done is not None:
+                done()
+            return
+        name = modules.pop(0)
+        importlib.import_module(name)
+        mark(f"preloaded {name}")
+        QTimer.singleShot(0, step)
+
+    QTimer.singleShot(0, step)
@@ -1,54 +1,94 @@
-from PySide6.QtWidgets import (
-    QWidget, QScrollArea, QLabel, QGridLayout, QGroupBox,
-    QPushButton, QVBoxLayout, QHBoxLayout,
-    QGraphicsOpacityEffect
-)
-from PySide6.QtCore import Qt
-
-
-class Task(QWidget):
-    def __init__(self, owner, task_id, task_title, priority, status):
-        super().__init__()
-        self.id = task_id
-        self.owner = owner
-        self.main_layout = QHBoxLayout()
-        self.main_layout.setSpacing(2)
-        self.setFixedWidth(100)
-
-        tag = QLabel()
-        tag.setFixedSize(5, 5)
-        match priority:
-            case "High":
-                tag.setStyleSheet("""
-                    background-color:'#eb002e';
-                    border-radius: 2%;
-                """)
-            case "Medium":
-                tag.setStyleSheet("""
-                    background-color:'#eba000';
-                    border-radius: 2%;
-                """)
-            case "Low":
-                tag.setStyleSheet("""
-                    background-color:'#1bbb58';
-                    border-radius: 2%;
-                """)
-
-        self.main_layout.addWidget(tag, alignment=Qt.AlignTop)
-
-        title = QLabel(task_title)
-        title.setWordWrap(True)
-        title.setFixedWidth(90)
-        font = title.font()
-        if status == "Completed":
-            opacity_effect = QGraphicsOpacityEffect()
-            title.setGraphicsEffect(opacity_effect)
-            title.graphicsEffect().setProperty("opacity", 0.25)
-        font.setPointSize(11)
-        title.setFont(font)
-        self.main_layout.addWidget(title)
-
-        self.setLayout(self.main_layout)
-
-    def mousePressEvent(self, a0) -> None:
-        self.owner._render_side_bar("task info", self.id)
+from PySide6.QtCore import Qt, QRect
+from PySide6.QtGui import QPainter, QColor, QFont, QFontMetrics, QTextLayout
+from collections import OrderedDict
+
+PRIORITY_COLORS = {
+    "High": QColor("#eb002e"),
+    "Medium": QColor("#eba000"),
+    "Low": QColor("#1bbb58"),
+}
+
+
+# Draws a task as a priority dot plus its word-wrapped title, dimmed when the
+# task is completed, straight onto a QPainter. Wrapping a title is the costly
+# part, so the wrapped lines are kept per (title, width) and reused by every
+# chip and every repaint that shows the same title at the same width.
+class ChipRenderer:
+    DOT = 5
+    INDENT = 11
+
+    def __init__(self, font: QFont, max_cached: int = 2048):
+        self.font = QFont(font)
+        self.font.setPointSize(11)
+        self.metrics = QFontMetrics(self.font)
+        self.max_cached = max_cached
+        self.lines = OrderedDict()  # (title, width) -> [str]
+
+    def line_height(self) -> int:
+        return self.metrics.height()
+
+    def wrap(self, title: str, width: int) -> list:
+        key = (title, width)
+        lines = self.lines.get(key)
+        if lines is not None:
+            self.lines.move_to_end(key)
+            return lines
+
+        layout = QTextLayout(title, self.font)
+        layout.beginLayout()
+        lines = []
+        while True:
+            line = layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(max(width, 1))
+            start = line.textStart()
+            lines.append(title[start:start + line.textLength()].rstrip())
+        layout.endLayout()
+
+        self.lines[key] = lines or [""]
+        if len(self.lines) > self.max_cached:
+            self.lines.popitem(last=False)
+        return self.lines[key]
+
+    def height(self, title: str, width: int) -> int:
+        return len(self.wrap(title, width - self.INDENT)) * self.line_height() + 4
+
+    def paint(self, painter: QPainter, rect: QRect, task, color: QColor,
+              priority_colors: dict = PRIORITY_COLORS) -> None:
+        # Lines that do not fit in rect are dropped, eliding the last one kept
+        line_h = self.line_height()
+        width = rect.width() - self.INDENT
+        lines = self.wrap(task.task_name, width)
+        fits = max(rect.height() // line_h, 1)
+        if len(lines) > fits:
+            lines = lines[:fits - 1] + [self.metrics.elidedText(
+                " ".join(lines[fits - 1:]), Qt.ElideRight, width)]
+
+        painter.save()
+        if task.status == "Completed":
+            painter.setOpacity(0.25)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(priority_colors.get(task.priority, color))
+        painter.drawRoundedRect(rect.left() + 2, rect.top() + 4,
+                                self.DOT, self.DOT, 2, 2)
+        painter.setPen(color)
+        painter.setFont(self.font)
+        y = rect.top()
+        for line in lines:
+            painter.drawText(QRect(rect.left() + self.INDENT, y, width, line_h),
+                             Qt.AlignLeft | Qt.AlignTop, line)
+            y += line_h
+        painter.restore()
+
+
+_renderer = None
+
+
+def chip_renderer() -> ChipRenderer:
+    # Shared so every view reuses the same wrapped-title cache
+    global _renderer
+    if _renderer is None:
+        _renderer = ChipRenderer(QFont())
+    return _renderer
+
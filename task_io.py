@@ -0,0 +1,245 @@
+import csv
+import json
+from datetime import date as Date, datetime, timezone
+from itertools import islice
+
+# Bulk import/export of a user's tasks as CSV, JSON Lines or iCalendar.
+# Files are read and written a record at a time through generators, and
+# imports are inserted in chunks of CHUNK rows, one transaction per chunk, so
+# memory stays flat however many tasks move. Both directions take an optional
+# progress(count) callable, called after every chunk, that may return True to
+# stop early.
+
+CHUNK = 5000
+FIELDS = ("task_name", "content", "priority", "status", "date", "hour", "minute")
+PRIORITIES = ("Low", "Medium", "High")
+
+# iCalendar PRIORITY is 1 (highest) to 9 (lowest), 0 meaning undefined
+ICS_PRIORITIES = {"High": 1, "Medium": 5, "Low": 9}
+
+
+def _task_values(record: dict) -> tuple | None:
+    # Normalizes one parsed record to a row for TaskRepository.insert_many;
+    # None for records that do not say what or when, or are no object at all
+    if not isinstance(record, dict):
+        return None
+    name = str(record.get("task_name") or record.get("title") or "").strip()
+    date = str(record.get("date") or "")[:10]
+    try:
+        # fromisoformat is far cheaper than strptime over 100k rows, but it
+        # also takes "YYYYMMDD" and week dates; only a date that reads back
+        # the same is in the "YYYY-MM-DD" form the views slice
+        if Date.fromisoformat(date).isoformat() != date:
+            return None
+    except ValueError:
+        return None
+    if not name:
+        return None
+
+    hour, minute = record.get("hour"), record.get("minute")
+    if hour in (None, "") and record.get("time"):
+        hour, _, minute = str(record["time"]).partition(":")
+    try:
+        hour = min(max(int(hour or 0), 0), 23)
+        minute = min(max(int(minute or 0), 0), 59)
+    except (TypeError, ValueError):
+        hour = minute = 0
+
+    priority = str(record.get("priority") or "").capitalize()
+    if priority not in PRIORITIES:
+        priority = "Medium"
+    status = str(record.get("status") or "").lower()
+    status = "Completed" if status in ("completed", "done", "true", "1") else "Pending"
+
+    return (name, str(record.get("content") or ""), priority, status,
+            date, hour, minute)
+
+
+# Readers
+
+def read_csv(path: str):
+    with open(path, newline="", encoding="utf-8") as file:
+        yield from csv.DictReader(file)
+
+
+def read_jsonl(path: str):
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _ics_lines(file):
+    # Unfolds continuation lines (RFC 5545 3.1) while streaming the file
+    line = None
+    for raw in file:
+        raw = raw.rstrip("\r\n")
+        if raw[:1] in (" ", "\t") and line is not None:
+            line += raw[1:]
+            continue
+        if line is not None:
+            yield line
+        line = raw
+    if line is not None:
+        yield line
+
+
+def _ics_unescape(text: str) -> str:
+    return (text.replace("\\n", "\n").replace("\\N", "\n")
+            .replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\"))
+
+
+def read_ics(path: str):
+    # VTODO and VEVENT components become tasks: SUMMARY, DESCRIPTION,
+    # DTSTART (or DUE), PRIORITY and STATUS. Components nested in them (an
+    # alarm's DESCRIPTION, say) are skipped.
+    with open(path, encoding="utf-8") as file:
+        record = None
+        depth = 0  # components open inside the current task
+        for line in _ics_lines(file):
+            name, _, value = line.partition(":")
+            name = name.split(";")[0].upper()
+            match name, value.upper():
+                case "BEGIN", _ if record is not None:
+                    depth += 1
+                case "END", _ if depth:
+                    depth -= 1
+                case "BEGIN", "VTODO" | "VEVENT":
+                    record = {}
+                case "END", "VTODO" | "VEVENT":
+                    if record is not None:
+                        yield record
+                    record = None
+                case _ if record is None or depth:
+                    pass
+                case "SUMMARY", _:
+                    record["task_name"] = _ics_unescape(value)
+                case "DESCRIPTION", _:
+                    record["content"] = _ics_unescape(value)
+                case "DTSTART" | "DUE", _:
+                    if "date" not in record or name == "DTSTART":
+                        record["date"] = f"{value[:4]}-{value[4:6]}-{value[6:8]}"
+                        record["hour"] = value[9:11] or 0
+                        record["minute"] = value[11:13] or 0
+                case "PRIORITY", _:
+                    level = int(value) if value.isdigit() else 0
+                    record["priority"] = ("High" if 1 <= level <= 4 else
+                                          "Medium" if level == 5 else
+                                          "Low" if level > 5 else None)
+                case "STATUS", _:
+                    record["status"] = "Completed" if value.upper() == "COMPLETED" else ""
+
+
+READERS = {".csv": read_csv, ".jsonl": read_jsonl, ".ics": read_ics}
+
+
+# Writers
+
+def write_csv(path: str, tasks):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(FIELDS)
+        for task in tasks:
+            writer.writerow([getattr(task, field) for field in FIELDS])
+            yield task
+
+
+def write_jsonl(path: str, tasks):
+    with open(path, "w", encoding="utf-8") as file:
+        for task in tasks:
+            file.write(json.dumps({field: getattr(task, field)
+                                   for field in FIELDS}, ensure_ascii=False))
+            file.write("\n")
+            yield task
+
+
+def _ics_escape(text: str) -> str:
+    return (text.replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\n", "\\n"))
+
+
+def _ics_fold(line: str) -> str:
+    # Content lines are at most 75 octets; longer ones continue after CRLF
+    # and a space
+    if len(line.encode("utf-8")) <= 75:
+        return line + "\r\n"
+    parts = []
+    current = ""
+    for char in line:
+        limit = 75 if not parts else 74
+        if len((current + char).encode("utf-8")) > limit:
+            parts.append(current)
+            current = ""
+        current += char
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def write_ics(path: str, tasks):
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        file.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+                   "PRODID:-//Mandarina//Task Manager//EN\r\n")
+        for task in tasks:
+            lines = (
+                "BEGIN:VTODO",
+                f"UID:task-{task.id}@mandarina",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART:{task.date.replace('-', '')}T"
+                f"{task.hour:02d}{task.minute:02d}00",
+                f"SUMMARY:{_ics_escape(task.task_name)}",
+                f"DESCRIPTION:{_ics_escape(task.content or '')}",
+                f"PRIORITY:{ICS_PRIORITIES.get(task.priority, 0)}",
+                "STATUS:" + ("COMPLETED" if task.status == "Completed"
+                             else "NEEDS-ACTION"),
+                "END:VTODO",
+            )
+            file.write("".join(_ics_fold(line) for line in lines))
+            yield task
+        file.write("END:VCALENDAR\r\n")
+
+
+WRITERS = {".csv": write_csv, ".jsonl": write_jsonl, ".ics": write_ics}
+
+
+def _format(path: str, table: dict):
+    for extension, handler in table.items():
+        if path.lower().endswith(extension):
+            return handler
+    raise ValueError(f"Unsupported file type: {path}")
+
+
+def import_tasks(repo, user_id: int, path: str, progress=None) -> tuple:
+    # Returns (imported, skipped)
+    read = _format(path, READERS)
+    skipped = 0
+
+    def rows():
+        nonlocal skipped
+        for record in read(path):
+            values = _task_values(record)
+            if values is None:
+                skipped += 1
+            else:
+                yield values
+
+    imported = 0
+    rows = rows()
+    while chunk := list(islice(rows, CHUNK)):
+        repo.insert_many(user_id, chunk)
+        imported += len(chunk)
+        if progress is not None and progress(imported):
+            break
+    return imported, skipped
+
+
+def export_tasks(repo, user_id: int, path: str, progress=None) -> int:
+    write = _format(path, WRITERS)
+    exported = 0
+    written = write(path, repo.iter_tasks(user_id))
+    for _ in written:
+        exported += 1
+        if exported % CHUNK == 0 and progress is not None and progress(exported):
+            break
+    written.close()
+    return exported
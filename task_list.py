@@ -0,0 +1,148 @@
+from PySide6.QtWidgets import QStyledItemDelegate, QStyle
+from PySide6.QtCore import (
+    Qt, QAbstractListModel, QModelIndex, QRect, QSize, Signal
+)
+from PySide6.QtGui import QColor, QFont, QFontMetrics
+from task_repository import PAGE_SIZE
+
+
+# Rows are pulled in pages from fetch_page(repo, after), where `after` is the
+# last task already loaded (None for the first page). Pages are fetched on the
+# background database worker; the view asks for the next one through
+# canFetchMore/fetchMore as the user scrolls to the bottom, and `loaded` fires
+# whenever a page lands or fails; `error` holds the failure until the next
+# query.
+class TaskListModel(QAbstractListModel):
+    TaskRole = Qt.UserRole + 1
+
+    loaded = Signal()
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.tasks = []
+        self.fetch_page = None
+        self.exhausted = True
+        self.pending = None  # worker ticket of the page on its way
+        self.error = None
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.tasks)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        task = self.tasks[index.row()]
+        match role:
+            case Qt.DisplayRole:
+                return task.task_name
+            case Qt.ToolTipRole:
+                return task.content
+            case self.TaskRole:
+                return task
+        return None
+
+    def set_query(self, fetch_page) -> None:
+        self.cancel()
+        self.beginResetModel()
+        self.tasks = []
+        self.fetch_page = fetch_page
+        self.exhausted = False
+        self.error = None
+        self.endResetModel()
+        self._request(None)
+
+    def cancel(self) -> None:
+        if self.pending is not None:
+            # Interrupts the query if the worker is already running it
+            self.db.cancel(self.pending)
+            self.pending = None
+
+    def is_loading(self) -> bool:
+        return self.pending is not None
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return (not parent.isValid() and not self.exhausted
+                and self.pending is None and bool(self.tasks))
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if self.canFetchMore(parent):
+            self._request(self.tasks[-1])
+
+    def _request(self, after) -> None:
+        fetch_page = self.fetch_page
+        self.pending = self.db.submit(
+            lambda repo: fetch_page(repo, after), self._on_page,
+            self._on_failed)
+
+    def _on_page(self, page) -> None:
+        self.pending = None
+        if len(page) < PAGE_SIZE:
+            self.exhausted = True
+        if page:
+            first = len(self.tasks)
+            self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+            self.tasks.extend(page)
+            self.endInsertRows()
+        self.loaded.emit()
+
+    def _on_failed(self, error) -> None:
+        # Ends the query as if it ran out of rows, keeping what was loaded
+        self.pending = None
+        self.error = error
+        self.exhausted = True
+        self.loaded.emit()
+
+
+# Paints one task card per visible row, so the view only pays for what is
+# on screen no matter how many tasks the model holds.
+class TaskDelegate(QStyledItemDelegate):
+    PADDING = 6
+    LINES = 6
+
+    def __init__(self, palette: dict, parent=None):
+        super().__init__(parent)
+        self.accent = QColor.fromString(palette["accent"])
+        self.sec_accent = QColor.fromString(palette["sec_accent"])
+
+    def sizeHint(self, option, index) -> QSize:
+        line = QFontMetrics(option.font).height()
+        return QSize(option.rect.width(), line * self.LINES + self.PADDING * 3)
+
+    def paint(self, painter, option, index) -> None:
+        task = index.data(TaskListModel.TaskRole)
+        if task is None:
+            return
+
+        painter.save()
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+
+        rect = option.rect.adjusted(self.PADDING, self.PADDING,
+                                    -self.PADDING, -self.PADDING)
+        bold = QFont(option.font)
+        bold.setBold(True)
+        metrics = QFontMetrics(option.font)
+        line = metrics.height()
+
+        rows = (
+            (task.task_name, bold, self.sec_accent),
+            (task.date, bold, self.accent),
+            (f"{task.hour:02d}:{task.minute:02d}", option.font, None),
+            (task.content or "", option.font, None),
+            (task.priority, option.font, None),
+            (task.status, option.font, None),
+        )
+        y = rect.top()
+        for text, font, color in rows:
+            painter.setFont(font)
+            painter.setPen(color if color else option.palette.text().color())
+            text = QFontMetrics(font).elidedText(
+                text.replace("\n", " "), Qt.ElideRight, rect.width())
+            painter.drawText(QRect(rect.left(), y, rect.width(), line),
+                             Qt.AlignLeft | Qt.AlignVCenter, text)
+            y += line
+
+        painter.setPen(option.palette.mid().color())
+        painter.drawLine(option.rect.bottomLeft(), option.rect.bottomRight())
+        painter.restore()
@@ -24,22 +24,46 @@ from datetime import datetime
 import sqlite3 as sql
 
 
+# One panel per kind ("task insertion", "task info" or "task edit"). The
+# widgets are built once by the _render_* method and bind() refills them for
+# the task being shown, so moving between tasks creates nothing.
 class TaskPanel(QWidget):
-    def __init__(self, owner, type, conn, uid, task_id):
+    def __init__(self, owner, type, store):
         super().__init__()
 
-        self.conn = conn
-        self.cur = self.conn.cursor()
+        self.store = store
         self.owner = owner
-        self.user_id = uid
+        self.user_id = store.user_id
+        self.type = type
+        self.task_id = 0
         self.lay = QVBoxLayout()
         self.setLayout(self.lay)
-        if type == "task insertion":
-            self._render_insertion()
-        elif type == "task info":
-            self._render_info(task_id)
-        else:
-            self._render_edit(task_id)
+        match type:
+            case "task insertion":
+                self._render_insertion()
+            case "task info":
+                self._render_info()
+            case _:
+                self._render_edit()
+
+    def bind(self, task_id):
+        self.task_id = task_id
+        match self.type:
+            case "task insertion":
+                self._bind_insertion()
+            case "task info":
+                self._bind_info(task_id)
+            case _:
+                self._bind_edit(task_id)
+
+    def _check_priority(self, priority):
+        # Exclusive groups cannot be cleared, so exclusivity is lifted while
+        # the buttons are set
+        self.priorities.setExclusive(False)
+        for radio in self.priorities.buttons():
+            radio.setChecked(radio.text() == priority)
+        self.priorities.setExclusive(True)
+        self.priority = priority
 
     def _render_insertion(self):
         container = QWidget()
@@ -57,11 +81,6 @@ class TaskPanel(QWidget):
         self.comment = QTextEdit()
         form_lay.addRow("Content", self.comment)
         self.date = QDateEdit()
-        self.date.setDate(
-            QDate(datetime.now().year,
-                  datetime.now().month,
-                  datetime.now().day)
-        )
         form_lay.addRow("Date", self.date)
         self.time = QTimeEdit()
         form_lay.addRow("Time", self.time)
@@ -97,24 +116,26 @@ class TaskPanel(QWidget):
         container.setLayout(container_lay)
         self.lay.addWidget(container)
 
-    def _render_info(self, id):
-        query = f"""
-            SELECT task_name, content, priority, 
-                    status, date, hour, minute FROM task 
-            WHERE id = {id};
-        """
-        self.cur.execute(query)
-        info = self.cur.fetchone()
-
-        (title, content, priority, status, date, hour, minute) = info
+    def _bind_insertion(self):
+        self.title.clear()
+        self.comment.clear()
+        self.date.setDate(
+            QDate(datetime.now().year,
+                  datetime.now().month,
+                  datetime.now().day)
+        )
+        self.time.setTime(QTime(0, 0))
+        self._check_priority(None)
 
+    def _render_info(self):
         container = QWidget()
         container.setObjectName("info")
         container.setFixedWidth(250)
         layout = QVBoxLayout()
         layout.setAlignment(Qt.AlignTop)
         # Title
-        t = QLabel(title)
+        t = QLabel()
+        self.info_title = t
         t.setFixedWidth(225)
         t.setWordWrap(True)
         t.setObjectName("primary")
@@ -122,27 +143,23 @@ class TaskPanel(QWidget):
         layout.addWidget(t, alignment=Qt.AlignTop)
 
         # Deadline
-        deadline = QLabel(date)
+        deadline = QLabel()
+        self.info_date = deadline
         deadline.setWordWrap(True)
         deadline.setObjectName("secondary")
         deadline.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Fixed)
         layout.addWidget(deadline, alignment=Qt.AlignTop)
 
         # Content
-        labels = [
-            f"Content: {content}",
-            f"Status: {status}",
-            f"Hour: {hour:02d}:{minute:02d}",
-            f"Priority: {priority}",
-        ]
-
-        for text in labels:
-            label = QLabel(text)
+        self.info_labels = []
+        for field in ("Content", "Status", "Hour", "Priority"):
+            label = QLabel()
             label.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Fixed)
             label.setWordWrap(True)
-            if "Priority" in text:
+            if field == "Priority":
                 label.setObjectName("accented")
             layout.addWidget(label, alignment=Qt.AlignTop)
+            self.info_labels.append(label)
 
         btns = QWidget()
         btns_layout = QHBoxLayout()
@@ -154,18 +171,19 @@ class TaskPanel(QWidget):
 
         edit = QPushButton("✎")
         edit.clicked.connect(
-            lambda: self.owner._render_side_bar("task edit", id))
+            lambda: self.owner._render_side_bar("task edit", self.task_id))
         edit.setFixedWidth(50)
         btns_layout.addWidget(edit)
 
         delete = QPushButton("⌫")
         delete.setFixedWidth(25)
-        delete.clicked.connect(lambda: self._delete(id))
+        delete.clicked.connect(lambda: self._delete(self.task_id))
         btns_layout.addWidget(delete)
 
         completed = QPushButton("✓")
         completed.setFixedWidth(25)
-        completed.clicked.connect(lambda: self._mark_as_complete(id))
+        completed.clicked.connect(
+            lambda: self._mark_as_complete(self.task_id))
         btns_layout.addWidget(completed)
 
         btns.setLayout(btns_layout)
@@ -176,20 +194,27 @@ class TaskPanel(QWidget):
 
         self.lay.addWidget(container, alignment=Qt.AlignTop)
 
+    def _bind_info(self, id):
+        info = self.store.get(id)
+        self.info_title.setText(info.task_name)
+        self.info_date.setText(info.date)
+        texts = [
+            f"Content: {info.content}",
+            f"Status: {info.status}",
+            f"Hour: {info.hour:02d}:{info.minute:02d}",
+            f"Priority: {info.priority}",
+        ]
+        for label, text in zip(self.info_labels, texts):
+            label.setText(text)
+
     def _on_priority_selected(self):
         selected_button = self.priorities.checkedButton()
         if selected_button:
             self.priority = selected_button.text()
 
     def _delete(self, id):
-        query = f"""
-        DELETE FROM task 
-        WHERE id = '{id}' 
-        AND user_id = '{self.user_id}'"""
-        self.cur.execute(query)
-        self.conn.commit()
-
-        self.owner._render_view()
+        self.store.delete(id)
+
         self.owner._render_side_bar("", 0)
 
     def _insert_task(self):
@@ -205,52 +230,30 @@ class TaskPanel(QWidget):
         title = self.title.text()
         content = self.comment.toPlainText()
         priority = self.priority
+        if priority is None:
+            QMessageBox.warning(self, "Mandarina 🍊 says: Wait!",
+                                "Please provide accepted values.")
+            return
         deadline = self.date.date().toString("yyyy-MM-dd")
         hour = self.time.time().hour()
         minute = self.time.time().minute()
 
-        query = f"""INSERT INTO task (task_name, content, priority, status, date, hour, minute, user_id)
-                        VALUES (
-                            '{title}', 
-                            '{content}', 
-                            '{priority}',
-                            'Pending', 
-                            '{deadline}',
-                            '{hour}',
-                            '{minute}',
-                            {self.user_id}
-                        );"""
-
         try:
-            self.cur.execute(query)
-            self.conn.commit()
+            self.store.insert(title, content, priority,
+                              deadline, hour, minute)
         except sql.Error as e:
             print(e)
             QMessageBox.warning(self, "Mandarina 🍊 says: Wait!",
                                 "Please provide accepted values.")
             return
 
-        self.owner._render_view()
         self.owner._render_side_bar("", 0)
 
     def _mark_as_complete(self, id):
-        query = f"UPDATE task SET status = 'Completed' WHERE id = {id}"
-        self.cur.execute(query)
-        self.conn.commit()
-        self.owner._render_view()
+        self.store.set_status(id, "Completed")
         self.owner._render_side_bar("", 0)
 
-    def _render_edit(self, id):
-        query = f"""
-            SELECT task_name, content, priority, 
-                    status, date, hour, minute FROM task 
-            WHERE id = {id};
-        """
-        self.cur.execute(query)
-        info = self.cur.fetchone()
-
-        (title, content, priority, status, date, hour, minute) = info
-
+    def _render_edit(self):
         container = QWidget()
         container_lay = QVBoxLayout()
 
@@ -262,18 +265,12 @@ class TaskPanel(QWidget):
         form_lay = QFormLayout()
 
         self.edit_title = QLineEdit()
-        self.edit_title.setText(title)
         form_lay.addRow("Title", self.edit_title)
         self.comment = QTextEdit()
-        self.comment.setText(content)
         form_lay.addRow("Content", self.comment)
         self.edit_date = QDateEdit()
-        d = QDate(int(date[:4]), int(date[5:7]), int(date[8:]))
-        self.edit_date.setDate(d)
         form_lay.addRow("Date", self.edit_date)
         self.edit_time = QTimeEdit()
-        t = QTime(int(hour), int(minute), 0)
-        self.edit_time.setTime(t)
         form_lay.addRow("Time", self.edit_time)
         self.priorities = QButtonGroup(form)
         btns = QWidget()
@@ -282,8 +279,6 @@ class TaskPanel(QWidget):
             radio = QRadioButton()
             radio.setText(p)
             self.priorities.addButton(radio)
-            if priority == p:
-                radio.setChecked(True)
             radio.toggled.connect(self._on_priority_selected)
             btns.layout().addWidget(radio)
         form_lay.addRow("Priority", btns)
@@ -295,7 +290,7 @@ class TaskPanel(QWidget):
 
         save = QPushButton("Save")
         save.setFixedWidth(80)
-        save.clicked.connect(lambda: self._update_task(id))
+        save.clicked.connect(lambda: self._update_task(self.task_id))
         footer_lay.addWidget(save, alignment=Qt.AlignmentFlag.AlignRight)
 
         cancel = QPushButton("Cancel")
@@ -309,6 +304,17 @@ class TaskPanel(QWidget):
         container.setLayout(container_lay)
         self.lay.addWidget(container)
 
+    def _bind_edit(self, id):
+        info = self.store.get(id)
+        date = info.date
+        self.edit_title.setText(info.task_name)
+        self.comment.setText(info.content)
+        d = QDate(int(date[:4]), int(date[5:7]), int(date[8:]))
+        self.edit_date.setDate(d)
+        t = QTime(int(info.hour), int(info.minute), 0)
+        self.edit_time.setTime(t)
+        self._check_priority(info.priority)
+
     def _update_task(self, id):
         if self.edit_title.text() == "":
             QMessageBox.warning(self, "Mandarina 🍊 says: Wait!",
@@ -322,18 +328,6 @@ class TaskPanel(QWidget):
         hour = self.edit_time.time().hour()
         minute = self.edit_time.time().minute()
 
-        query = f"""
-            UPDATE task SET 
-                task_name = '{title}',
-                content = '{content}',
-                date = '{deadline}',
-                hour = {hour},
-                minute = {minute},
-                priority = '{priority}'
-            WHERE id = {id};
-        """
-        self.cur.execute(query)
-        self.conn.commit()
-
-        self.owner._render_view()
+        self.store.update(id, title, content, priority, deadline, hour, minute)
+
         self.owner._render_side_bar("", 0)
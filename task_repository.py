@@ -0,0 +1,276 @@
+import sqlite3
+
+
+class TaskRow:
+    # Compact row object so widgets read t.priority instead of t[-2].
+    # rank is only set by keyword searches (bm25 score, lower is better).
+    __slots__ = ("id", "task_name", "content", "priority", "status",
+                 "date", "hour", "minute", "user_id", "rank")
+
+    def __init__(self, id, task_name, content, priority, status,
+                 date, hour, minute, user_id, rank=None):
+        self.id = id
+        self.task_name = task_name
+        self.content = content
+        self.priority = priority
+        self.status = status
+        self.date = date
+        self.hour = hour
+        self.minute = minute
+        self.user_id = user_id
+        self.rank = rank
+
+    def __repr__(self) -> str:
+        return f"TaskRow(id={self.id}, task_name={self.task_name!r}, date={self.date!r})"
+
+
+def _task_row(cursor, row) -> TaskRow:
+    return TaskRow(*row)
+
+
+TASK_COLUMNS = "id, task_name, content, priority, status, date, hour, minute, user_id"
+
+
+def start_key(task: TaskRow) -> str:
+    # Same "YYYY-MM-DD HH:MM" value the database keeps in task.start
+    return f"{task.date} {task.hour:02d}:{task.minute:02d}"
+
+
+# Extra predicates and sort keys for TaskRepository.filter_page. Every
+# combination maps to a fixed statement text, so SQLite prepares each of them
+# only once. Pages are walked with keyset pagination: the next page starts
+# right after the sort key (plus id as tie-breaker) of the last row seen.
+FILTERS = {
+    "all": "",
+    "priority": "AND priority = ?",
+    "status": "AND status = ?",
+    "time": "AND hour BETWEEN ? AND ?",
+}
+ORDERINGS = {
+    "Name": ("task_name, id", lambda t: (t.task_name, t.id)),
+    "Date": ("start, id", lambda t: (start_key(t), t.id)),
+    "Hour": ("hour, minute, id", lambda t: (t.hour, t.minute, t.id)),
+}
+
+
+def _filter_query(predicate: str, columns: str, keyset: bool) -> str:
+    after = ""
+    if keyset:
+        marks = ", ".join("?" * len(columns.split(",")))
+        after = f"AND ({columns}) > ({marks})"
+    return f"""
+        SELECT {TASK_COLUMNS} FROM task
+        WHERE user_id = ? {predicate} {after}
+        ORDER BY {columns}
+        LIMIT ?
+    """
+
+
+FILTER_QUERIES = {
+    (kind, order, keyset): _filter_query(predicate, columns, keyset)
+    for kind, predicate in FILTERS.items()
+    for order, (columns, _) in ORDERINGS.items()
+    for keyset in (False, True)
+}
+
+# Keyword searches go through the task_fts index and are always ranked by
+# bm25 relevance, paging on (rank, id) instead of the "Sort by" key.
+KEYWORD_QUERIES = {
+    keyset: f"""
+        SELECT {TASK_COLUMNS}, rank FROM (
+            SELECT task.*, bm25(task_fts) AS rank
+            FROM task_fts JOIN task ON task.id = task_fts.rowid
+            WHERE task_fts MATCH ? AND task.user_id = ?
+        )
+        {"WHERE (rank, id) > (?, ?)" if keyset else ""}
+        ORDER BY rank, id
+        LIMIT ?
+    """
+    for keyset in (False, True)
+}
+
+PAGE_SIZE = 100
+
+
+def fts_query(text: str) -> str:
+    # Turns free text into an FTS5 query: "quoted words" stay phrases and
+    # every other word matches as a prefix, all of them required.
+    terms = []
+    for i, chunk in enumerate(text.split('"')):
+        if i % 2:
+            words = [chunk.strip()] if chunk.strip() else []
+            suffix = ""
+        else:
+            words = [w.rstrip("*") for w in chunk.split()]
+            suffix = "*"
+        for word in words:
+            if word:
+                terms.append('"' + word.replace('"', '""') + '"' + suffix)
+    return " ".join(terms)
+
+
+# Data-access layer shared by every widget; all SQL lives here
+class TaskRepository:
+    def __init__(self, conn: sqlite3.Connection, commits=None):
+        self.conn = conn
+        self.cur = self.conn.cursor()
+        self.task_cur = self.conn.cursor()
+        self.task_cur.row_factory = _task_row
+        # Optional CommitQueue; without one every write commits right away
+        self.commits = commits
+
+    def _commit(self) -> None:
+        if self.commits is None:
+            self.conn.commit()
+        else:
+            self.commits.written()
+
+    # Users
+
+    def find_user(self, username: str):
+        self.cur.execute(
+            "SELECT user_id, password FROM user WHERE username = ?",
+            (username,))
+        return self.cur.fetchone()
+
+    def add_user(self, username: str, password: str) -> int:
+        self.cur.execute(
+            "INSERT INTO user (username, password) VALUES (?, ?)",
+            (username, password))
+        self._commit()
+        return self.cur.lastrowid
+
+    # Tasks
+
+    def fetch_range(self, user_id: int, start: str, end: str) -> list:
+        # start/end are "YYYY-MM-DD" bounds on the indexed start key
+        self.task_cur.execute(f"""
+            SELECT {TASK_COLUMNS} FROM task
+            WHERE user_id = ? AND start >= ? AND start < ?
+            ORDER BY start
+        """, (user_id, start, end))
+        return self.task_cur.fetchall()
+
+    def get(self, task_id: int) -> TaskRow | None:
+        self.task_cur.execute(
+            f"SELECT {TASK_COLUMNS} FROM task WHERE id = ?", (task_id,))
+        return self.task_cur.fetchone()
+
+    def insert(self, user_id: int, task_name: str, content: str, priority: str,
+               date: str, hour: int, minute: int) -> int:
+        self.cur.execute("""
+            INSERT INTO task (task_name, content, priority, status,
+                              date, hour, minute, user_id)
+            VALUES (?, ?, ?, 'Pending', ?, ?, ?, ?)
+        """, (task_name, content, priority, date, hour, minute, user_id))
+        self._commit()
+        return self.cur.lastrowid
+
+    def update(self, task_id: int, task_name: str, content: str, priority: str,
+               date: str, hour: int, minute: int) -> None:
+        self.cur.execute("""
+            UPDATE task SET
+                task_name = ?,
+                content = ?,
+                date = ?,
+                hour = ?,
+                minute = ?,
+                priority = ?
+            WHERE id = ?
+        """, (task_name, content, date, hour, minute, priority, task_id))
+        self._commit()
+
+    def set_status(self, task_id: int, status: str) -> None:
+        self.cur.execute(
+            "UPDATE task SET status = ? WHERE id = ?", (status, task_id))
+        self._commit()
+
+    def delete(self, user_id: int, task_id: int) -> None:
+        self.cur.execute(
+            "DELETE FROM task WHERE id = ? AND user_id = ?", (task_id, user_id))
+        self._commit()
+
+    def insert_many(self, user_id: int, tasks) -> None:
+        # tasks yields (task_name, content, priority, status, date, hour,
+        # minute) tuples; they go in as one transaction
+        self.cur.executemany("""
+            INSERT INTO task (task_name, content, priority, status,
+                              date, hour, minute, user_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (task + (user_id,) for task in tasks))
+        self.conn.commit()
+
+    def iter_tasks(self, user_id: int):
+        # Every task of the user in start order, read lazily off a cursor of
+        # its own so callers never hold the whole table in memory
+        cursor = self.conn.cursor()
+        cursor.row_factory = _task_row
+        yield from cursor.execute(f"""
+            SELECT {TASK_COLUMNS} FROM task
+            WHERE user_id = ?
+            ORDER BY start, id
+        """, (user_id,))
+
+    def filter_page(self, user_id: int, order: str, kind: str = "all",
+                    value=None, after: TaskRow | None = None,
+                    limit: int = PAGE_SIZE) -> list:
+        # Up to `limit` rows following `after` (the last row of the previous
+        # page, None for the first page) in the chosen order
+        match kind:
+            case "keyword":
+                return self._search_page(user_id, value, after, limit)
+            case "time":
+                params = (user_id, *value)
+            case "priority" | "status":
+                params = (user_id, value)
+            case _:
+                params = (user_id,)
+        if after is not None:
+            params += ORDERINGS[order][1](after)
+        self.task_cur.execute(
+            FILTER_QUERIES[(kind, order, after is not None)], params + (limit,))
+        return self.task_cur.fetchall()
+
+    def _search_page(self, user_id: int, text: str, after: TaskRow | None,
+                     limit: int) -> list:
+        query = fts_query(text)
+        if not query:
+            return self.filter_page(user_id, "Date", after=after, limit=limit)
+        params = (query, user_id)
+        if after is not None:
+            params += (after.rank, after.id)
+        self.task_cur.execute(KEYWORD_QUERIES[after is not None],
+                              params + (limit,))
+        return self.task_cur.fetchall()
+
+    # Summaries, read from the trigger-maintained task_stats counters: at
+    # most one row per status/priority pair, however many tasks there are
+
+    def count_by_status(self, user_id: int) -> dict:
+        self.cur.execute("""
+            SELECT status, SUM(count) FROM task_stats
+            WHERE user_id = ?
+            GROUP BY status
+            HAVING SUM(count) > 0
+        """, (user_id,))
+        return dict(self.cur.fetchall())
+
+    def count_by_day(self, user_id: int, start: str, end: str) -> dict:
+        # Tasks per "YYYY-MM-DD" in [start, end). The (user_id, start) index
+        # finds them, but each row is still read: SQLite does not answer from
+        # an index on a virtual column alone
+        self.cur.execute("""
+            SELECT substr(start, 1, 10), COUNT(*) FROM task
+            WHERE user_id = ? AND start >= ? AND start < ?
+            GROUP BY 1
+        """, (user_id, start, end))
+        return dict(self.cur.fetchall())
+
+    def count_by_priority(self, user_id: int) -> dict:
+        self.cur.execute("""
+            SELECT priority, SUM(count) FROM task_stats
+            WHERE user_id = ?
+            GROUP BY priority
+            HAVING SUM(count) > 0
+        """, (user_id,))
+        return dict(self.cur.fetchall())
@@ -0,0 +1,263 @@
+from PySide6.QtCore import QObject, Signal
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from task_repository import TaskRow
+
+
+def _month_of(date: str) -> tuple:
+    return int(date[:4]), int(date[5:7])
+
+
+def _next_month(year: int, month: int) -> tuple:
+    return (year, month + 1) if month < 12 else (year + 1, 1)
+
+
+# What a mutation did to one task: old and new are its (date, hour) slot
+# before and after, None when the task did not exist on that side
+class TaskChange:
+    __slots__ = ("task", "old", "new")
+
+    def __init__(self, task: TaskRow, old: tuple | None, new: tuple | None):
+        self.task = task
+        self.old = old
+        self.new = new
+
+
+# Per-user, in-memory copy of the task table. Tasks are bucketed by month and
+# by day ("YYYY-MM-DD") and indexed by id; months are loaded on demand and the
+# least recently used ones are dropped once more than max_months are held.
+# Every mutation goes through the repository first and then patches the
+# buckets, so views can render without touching the database. Views that must
+# not block use has_range/load_async, which fill missing months through the
+# background database worker. Each mutation is announced through `changed`
+# with a TaskChange, so views can patch just the affected cells.
+class TaskStore(QObject):
+    changed = Signal(object)
+
+    def __init__(self, repo, db, user_id: int, max_months: int = 24):
+        super().__init__()
+        self.repo = repo
+        self.db = db
+        self.user_id = user_id
+        self.max_months = max_months
+        self.months = OrderedDict()  # (year, month) -> {date: [TaskRow]}
+        self.by_id = {}
+        self.version = 0  # bumped on every mutation
+        self.prefetching = False  # a prefetch is on the database worker
+        self.prefetch_next = None  # latest range asked for meanwhile
+
+    def load(self) -> None:
+        today = datetime.today()
+        self.tasks_by_day(today.replace(day=1),
+                          today.replace(day=1) + timedelta(days=31))
+
+    def tasks_by_day(self, start: datetime, end: datetime) -> dict:
+        # Tasks in [start, end) grouped by "YYYY-MM-DD"
+        self._ensure_months(start, end)
+        first = start.strftime("%Y-%m-%d")
+        last = end.strftime("%Y-%m-%d")
+        tasks_by_day = {}
+        for key in self._months_between(start, end):
+            for date, tasks in self.months[key].items():
+                if first <= date < last:
+                    tasks_by_day[date] = tasks
+        return tasks_by_day
+
+    def has_range(self, start: datetime, end: datetime) -> bool:
+        return all(key in self.months
+                   for key in self._months_between(start, end))
+
+    def load_async(self, start: datetime, end: datetime, callback,
+                   failed=None) -> int | None:
+        # Loads the months of [start, end) that are not cached on the database
+        # worker and calls callback() once they are in the store, or
+        # failed(error) if the query fails. Returns the worker ticket, or None
+        # when everything was already cached.
+        keys = self._months_between(start, end)
+        missing = [key for key in keys if key not in self.months]
+        if not missing:
+            callback()
+            return None
+        first = f"{missing[0][0]}-{missing[0][1]:02d}-01"
+        year, month = _next_month(*missing[-1])
+        last = f"{year}-{month:02d}-01"
+        user_id = self.user_id
+        version = self.version
+
+        def submit(ticket=None) -> int:
+            nonlocal version
+            version = self.version
+            return self.db.submit(
+                lambda repo: repo.fetch_range(user_id, first, last), done,
+                failed, ticket)
+
+        def done(tasks):
+            if version != self.version:
+                # Edited while loading; the rows may predate the edit. Read
+                # again under the same ticket, so the caller can still cancel
+                submit(ticket)
+                return
+            self._fill(missing, tasks)
+            self._touch(keys)
+            callback()
+
+        ticket = submit()
+        return ticket
+
+    def prefetch(self, start: datetime, end: datetime) -> None:
+        # Warms the months of [start, end) in the background so the next page
+        # renders from memory. One prefetch runs at a time and is never
+        # interrupted; ranges asked for meanwhile collapse into the latest.
+        if self.prefetching:
+            self.prefetch_next = (start, end)
+            return
+
+        def done():
+            self.prefetching = False
+            if self.prefetch_next is not None:
+                self.prefetch(*self.prefetch_next)
+
+        def failed(error):
+            # Only a warm-up; a view that needs these months loads them
+            # itself and shows the error then
+            print(error)
+            done()
+
+        self.prefetch_next = None
+        self.prefetching = self.load_async(start, end, done,
+                                           failed) is not None
+
+    def tasks_on(self, day: datetime) -> list:
+        return self.tasks_by_day(day, day + timedelta(days=1)).get(
+            day.strftime("%Y-%m-%d"), [])
+
+    def get(self, task_id: int) -> TaskRow | None:
+        task = self.by_id.get(task_id)
+        if task is None:
+            task = self.repo.get(task_id)
+        return task
+
+    def insert(self, task_name: str, content: str, priority: str,
+               date: str, hour: int, minute: int) -> TaskRow:
+        task_id = self.repo.insert(self.user_id, task_name, content, priority,
+                                   date, hour, minute)
+        self.version += 1
+        task = TaskRow(task_id, task_name, content, priority, "Pending",
+                       date, hour, minute, self.user_id)
+        self._add(task)
+        self.changed.emit(TaskChange(task, None, (date, hour)))
+        return task
+
+    def update(self, task_id: int, task_name: str, content: str, priority: str,
+               date: str, hour: int, minute: int) -> TaskRow:
+        # Read first: a task outside the cached months comes from the
+        # database, and after the write it would already hold the new slot
+        task = self.get(task_id)
+        old = (task.date, task.hour)
+        self.repo.update(task_id, task_name, content, priority,
+                         date, hour, minute)
+        self.version += 1
+        self._discard(task)
+        task.task_name = task_name
+        task.content = content
+        task.priority = priority
+        task.date = date
+        task.hour = hour
+        task.minute = minute
+        self._add(task)
+        self.changed.emit(TaskChange(task, old, (date, hour)))
+        return task
+
+    def set_status(self, task_id: int, status: str) -> TaskRow:
+        self.repo.set_status(task_id, status)
+        self.version += 1
+        task = self.get(task_id)
+        task.status = status
+        slot = (task.date, task.hour)
+        self.changed.emit(TaskChange(task, slot, slot))
+        return task
+
+    def delete(self, task_id: int) -> TaskRow | None:
+        task = self.get(task_id)
+        self.repo.delete(self.user_id, task_id)
+        self.version += 1
+        if task is not None:
+            self._discard(task)
+            self.changed.emit(TaskChange(task, (task.date, task.hour), None))
+        return task
+
+    def invalidate(self) -> None:
+        self.version += 1  # loads in flight would bring back stale rows
+        self.months.clear()
+        self.by_id.clear()
+        self.prefetching = False
+
+    def _months_between(self, start: datetime, end: datetime) -> list:
+        keys = []
+        key = (start.year, start.month)
+        last = end - timedelta(days=1)
+        while key <= (last.year, last.month):
+            keys.append(key)
+            key = _next_month(*key)
+        return keys
+
+    def _ensure_months(self, start: datetime, end: datetime) -> None:
+        keys = self._months_between(start, end)
+        missing = [key for key in keys if key not in self.months]
+        # Contiguous runs of missing months are fetched with one range query
+        runs = []
+        for key in missing:
+            if runs and _next_month(*runs[-1][-1]) == key:
+                runs[-1].append(key)
+            else:
+                runs.append([key])
+        for run in runs:
+            self._load_months(run)
+        self._touch(keys)
+
+    def _touch(self, keys: list) -> None:
+        # Marks keys as most recently used and evicts beyond max_months
+        for key in keys:
+            self.months.move_to_end(key)
+        while len(self.months) > max(self.max_months, len(keys)):
+            _, days = self.months.popitem(last=False)
+            for tasks in days.values():
+                for task in tasks:
+                    self.by_id.pop(task.id, None)
+
+    def _load_months(self, keys: list) -> None:
+        first = f"{keys[0][0]}-{keys[0][1]:02d}-01"
+        year, month = _next_month(*keys[-1])
+        self._fill(keys, self.repo.fetch_range(self.user_id, first,
+                                               f"{year}-{month:02d}-01"))
+
+    def _fill(self, keys: list, tasks: list) -> None:
+        # Months already cached keep their rows (and any edits made to them)
+        keys = [key for key in keys if key not in self.months]
+        for key in keys:
+            self.months[key] = {}
+        for task in tasks:
+            month = _month_of(task.date)
+            if month in keys:
+                self.months[month].setdefault(task.date, []).append(task)
+                self.by_id[task.id] = task
+
+    def _add(self, task: TaskRow) -> None:
+        days = self.months.get(_month_of(task.date))
+        if days is None:
+            return  # Month not cached; it will be read fresh when needed
+        tasks = days.setdefault(task.date, [])
+        tasks.append(task)
+        tasks.sort(key=lambda t: (t.hour, t.minute, t.id))
+        self.by_id[task.id] = task
+
+    def _discard(self, task: TaskRow) -> None:
+        self.by_id.pop(task.id, None)
+        days = self.months.get(_month_of(task.date))
+        if days is None:
+            return
+        tasks = days.get(task.date, [])
+        if task in tasks:
+            tasks.remove(task)
+        if not tasks:
+            days.pop(task.date, None)
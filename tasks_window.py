@@ -3,6 +3,7 @@ from PySide6.QtWidgets import (
     QPushButton,
     QRadioButton,
     QScrollArea,
+    QListView,
     QWidget,
     QLabel,
     QComboBox,
@@ -20,17 +21,17 @@ from PySide6.QtCore import Qt, QTimer, QTime, QDate
 from PySide6.QtGui import QGuiApplication, QFont, QPainter, QPen, QColor
 from PySide6.QtCharts import QChart, QChartView, QPieSeries, QPieSlice
 from datetime import datetime
+from task_list import TaskListModel, TaskDelegate
 
 
 class TasksWindow(QMainWindow):
-    def __init__(self, parent, conn, id, palette, theme):
+    def __init__(self, parent, db, id, palette, theme):
         super().__init__(parent)
         screen = QGuiApplication.primaryScreen().geometry()
         screen_width = screen.width()
         screen_height = screen.height()
         self.setFixedSize(screen_width*0.5, screen_height*0.4)
-        self.conn = conn
-        self.cur = self.conn.cursor()
+        self.db = db
         self.user_id = id
         self.theme = theme
         self.palette = palette
@@ -50,10 +51,20 @@ class TasksWindow(QMainWindow):
         self.sortby.setMaximumWidth(100)
         results.layout().addWidget(self.sortby)
 
-        self.tasks_found = QScrollArea()
-        # self.tasks_found.setFixedWidth()
+        # Virtualized results: only the rows in view are ever painted
+        self.tasks_model = TaskListModel(self.db, self)
+        self.tasks_model.loaded.connect(self._update_placeholder)
+        self.tasks_found = QListView()
+        self.tasks_found.setModel(self.tasks_model)
+        self.tasks_found.setItemDelegate(TaskDelegate(self.palette, self))
+        self.tasks_found.setUniformItemSizes(True)
+        self.tasks_found.setVerticalScrollMode(QListView.ScrollPerPixel)
         results.layout().addWidget(self.tasks_found)
 
+        self.no_tasks = QLabel("No tasks found c:")
+        self.no_tasks.hide()
+        results.layout().addWidget(self.no_tasks)
+
         lay.addWidget(results)
 
         options = QWidget()
@@ -62,7 +73,14 @@ class TasksWindow(QMainWindow):
 
         options.layout().addWidget(QLabel("Keyword:"))
         self.keyword = QLineEdit()
+        self.keyword.setPlaceholderText("Type to search…")
         options.layout().addWidget(self.keyword)
+        # Live results while typing; each new search cancels the last one
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(lambda: self.filter("keyword"))
+        self.keyword.textChanged.connect(lambda: self.search_timer.start())
         self.filter_by_kw = QPushButton("Filter by Keyword")
         self.filter_by_kw.clicked.connect(lambda: self.filter("keyword"))
         self.filter_by_kw.setFixedWidth(120)
@@ -102,33 +120,16 @@ class TasksWindow(QMainWindow):
 
         lay.addWidget(self._create_chart())
 
-        self._render_tasks(self._get_tasks())
+        self.filter("all")
 
         window.setLayout(lay)
         self.setCentralWidget(window)
 
     def _create_chart(self):
         series = QPieSeries()
-        completed = 0
-        pending = 0
-
-        query = f"""
-            SELECT status
-            FROM task
-            WHERE
-                user_id = {self.user_id}
-        """
-        self.cur.execute(query)
-        filtered_tasks = self.cur.fetchall()
-
-        for task in filtered_tasks:
-            if task[0] == 'Completed':
-                completed += 1
-            else:
-                pending += 1
-
-        series.append("Completed", completed)
-        series.append("Pending", pending)
+        # Empty until the counts arrive from the database worker
+        series.append("Completed", 0)
+        series.append("Pending", 0)
 
         # adding slice
         slice = QPieSlice()
@@ -153,107 +154,65 @@ class TasksWindow(QMainWindow):
         bg = "dark_bg" if self.theme == "dark" else "bg"
         chart.setBackgroundBrush(QColor.fromString(self.palette[bg]))
 
+        user_id = self.user_id
+        self.db.submit(
+            lambda repo: repo.count_by_status(user_id),
+            lambda counts: self._update_chart(series, counts),
+            lambda error: chart.setTitle(
+                f"Task counts could not be loaded.\n{error}"))
+
         chartview = QChartView(chart)
         chartview.setRenderHint(QPainter.Antialiasing)
 
         return chartview
 
-    def _get_tasks(self):
-        query = f"SELECT task_name, date, hour, minute, content, priority, status FROM task WHERE user_id = {self.user_id}"
-        self.cur.execute(query)
-        all_tasks = self.cur.fetchall()
-
-        return all_tasks
-
-    def _get_ordering(self):
-        match self.sortby.currentText():
-            case "Name":
-                return "task_name"
-            case "Date":
-                return "date"
-            case "Hour":
-                return "hour"
-        return ""
+    def _update_chart(self, series, counts):
+        completed = counts.get("Completed", 0)
+        series.slices()[0].setValue(completed)
+        series.slices()[1].setValue(sum(counts.values()) - completed)
 
     def filter(self, type):
-        query = f"""SELECT task_name, date, hour, minute, content, priority, status
-                    FROM task
-                    WHERE user_id = {self.user_id}
-                    ORDER BY {self._get_ordering()} ASC;"""
+        value = None
         match type:
             case "keyword":
-                query = f"""
-                    SELECT task_name, date, hour, minute, content, priority, status
-                    FROM task
-                    WHERE user_id = {self.user_id}
-                        AND (task_name LIKE '%{self.keyword.text()}%'
-                        OR content LIKE '%{self.keyword.text()}%')
-                        ORDER BY {self._get_ordering()} ASC;
-                """
+                value = self.keyword.text()
             case "priority":
-                query = f"""
-                    SELECT task_name, date, hour, minute, content, priority, status
-                    FROM task
-                    WHERE user_id = {self.user_id}
-                        AND priority = '{self.priority.currentText()}'
-                        ORDER BY {self._get_ordering()} ASC;
-                """
+                value = self.priority.currentText()
             case "status":
-                query = f"""
-                    SELECT task_name, date, hour, minute, content, priority, status
-                    FROM task
-                    WHERE user_id = {self.user_id}
-                        AND status = '{self.status.currentText()}'
-                        ORDER BY {self._get_ordering()};
-                """
+                value = self.status.currentText()
             case "time":
                 time_frames = {
-                    "Morning": [0, 12],
-                    "Afternoon": [13, 18],
-                    "Night": [19, 23]
+                    "Morning": (0, 12),
+                    "Afternoon": (13, 18),
+                    "Night": (19, 23)
                 }
-                query = f"""
-                    SELECT task_name, date, hour, minute, content, priority, status
-                    FROM task
-                    WHERE user_id = {self.user_id}
-                        AND hour BETWEEN {time_frames[self.time_frame.currentText()][0]}
-                            AND {time_frames[self.time_frame.currentText()][1]}
-                    ORDER BY {self._get_ordering()};
-                """
-        self.cur.execute(query)
-        tasks = self.cur.fetchall()
-
-        self._render_tasks(tasks)
-
-    def _render_tasks(self, tasks):
-        container = QWidget()
-        container.setLayout(QVBoxLayout())
-        if len(tasks) < 1:
-            container.layout().addWidget(QLabel("No tasks found c:"))
-            self.tasks_found.setWidget(container)
+                value = time_frames[self.time_frame.currentText()]
+        order = self.sortby.currentText()
+        user_id = self.user_id
+        self.search_timer.stop()
+
+        # Rows are fetched a page at a time, off the GUI thread, as the list
+        # is scrolled
+        self.tasks_model.set_query(
+            lambda repo, after: repo.filter_page(user_id, order,
+                                                 type, value, after))
+        self._update_placeholder()
+        self.tasks_found.scrollToTop()
+
+    def _update_placeholder(self):
+        if self.tasks_model.error is not None:
+            self.no_tasks.setText(
+                f"Tasks could not be loaded.\n{self.tasks_model.error}")
+        elif self.tasks_model.rowCount() > 0:
+            self.no_tasks.hide()
             return
-        for task in tasks:
-            w = QWidget()
-            w.setLayout(QVBoxLayout())
-
-            title = QLabel(task[0])
-            title.setFixedWidth(150)
-            title.setWordWrap(True)
-            title.setObjectName("secondary")
-            w.layout().addWidget(title)
-
-            date = QLabel(task[1])
-            date.setObjectName("accented")
-            w.layout().addWidget(date)
-
-            hour = QLabel(f"{task[2]:02d}:{task[3]:02d}")
-            w.layout().addWidget(hour)
-
-            for field in [task[4], task[5], task[6]]:
-                l = QLabel(field)
-                l.setFixedWidth(150)
-                l.setWordWrap(True)
-                w.layout().addWidget(l)
-
-            container.layout().addWidget(w)
-        self.tasks_found.setWidget(container)
+        else:
+            self.no_tasks.setText("Loading tasks…"
+                                  if self.tasks_model.is_loading()
+                                  else "No tasks found c:")
+        self.no_tasks.show()
+
+    def closeEvent(self, event):
+        self.search_timer.stop()
+        self.tasks_model.cancel()
+        super().closeEvent(event)
@@ -0,0 +1,133 @@
+from PySide6.QtWidgets import QApplication
+import os
+import string
+import hashlib
+from db_setup import CONFIG_DIR
+
+PALETTES = {
+    "Mandarina": {
+        "bg": "#ffffff",
+        "fg": "#394d46",
+        "dark_bg": "#2a292d",
+        "dark_fg": "#8bb39a",
+        "accent": "#ff8f1f",
+        "sec_accent": "#1fc271",
+    },
+    "Olive Yards":  {
+        "bg": "#DCD7C9",
+        "fg": "#252220",
+        "dark_bg": "#252220",
+        "dark_fg": "#DCD7C9",
+        "accent": "#5F6F52",
+        "sec_accent": "#A27B5C",
+    },
+    "Peach Dreams": {
+        "bg": "#fff0e1",
+        "fg": "#8c6d88",
+        "dark_bg": "#2b262c",
+        "dark_fg": "#d3adce",
+        "accent": "#f599a6",
+        "sec_accent": "#9ab0a7",
+    },
+    "Eggplant Haze":  {
+        "bg": "#FFF6E0",
+        "fg": "#272829",
+        "dark_bg": "#272829",
+        "dark_fg": "#FFF6E0",
+        "accent": "#727ea2",
+        "sec_accent": "#8b949d",
+    },
+    "Coffee Espresso":  {
+        "bg": "#F8F4E1",
+        "fg": "#543310",
+        "dark_bg": "#1e1b1a",
+        "dark_fg": "#F8F4E1",
+        "accent": "#74512D",
+        "sec_accent": "#AF8F6F",
+    },
+    "Cherry Blossom": {
+        "bg": "#ebe8de",
+        "fg": "#6d303b",
+        "dark_bg": "#2a2627",
+        "dark_fg": "#92b6a4",
+        "accent": "#ff405a",
+        "sec_accent": "#1fb551",
+    },
+    "Blueberry Sparks":  {
+        "bg": "#eeecf9",
+        "fg": "#4a4561",
+        "dark_bg": "#2d2b36",
+        "dark_fg": "#bcb5d8",
+        "accent": "#826fd7",
+        "sec_accent": "#4ea771",
+    },
+    "Grape Fusion":  {
+        "bg": "#f9feff",
+        "fg": "#2D336B",
+        "dark_bg": "#23242e",
+        "dark_fg": "#f9feff",
+        "accent": "#2a48d0",
+        "sec_accent": "#7886C7",
+    },
+    "Lemon Aid":  {
+        "bg": "#fffef8",
+        "fg": "#6a705a",
+        "dark_bg": "#222320",
+        "dark_fg": "#fbfbf3",
+        "accent": "#edd239",
+        "sec_accent": "#acde31",
+    }
+}
+
+THEME_FILES = {
+    "light": os.path.join(os.path.dirname(__file__), "light_theme.qss"),
+    "dark": os.path.join(os.path.dirname(__file__), "dark_theme.qss"),
+}
+CACHE_DIR = os.path.join(CONFIG_DIR, "themes")
+
+_compiled = {}  # (palette, theme) -> stylesheet
+_applied = None  # (palette, theme) currently on the QApplication
+
+
+def compile_theme(palette: str, theme: str) -> str:
+    # The substituted stylesheet for a palette/theme pair. Kept in memory for
+    # the session and on disk between sessions; the disk entry is named after
+    # the template's mtime and the palette colors, so editing either one
+    # compiles it afresh.
+    key = (palette, theme)
+    if key in _compiled:
+        return _compiled[key]
+
+    template_file = THEME_FILES[theme]
+    colors = PALETTES[palette]
+    digest = hashlib.sha1(
+        f"{os.stat(template_file).st_mtime_ns}{sorted(colors.items())}"
+        .encode()).hexdigest()[:12]
+    cache_file = os.path.join(
+        CACHE_DIR, f"{palette.replace(' ', '_')}.{theme}.{digest}.qss")
+
+    try:
+        with open(cache_file, "r") as file:
+            qss = file.read()
+    except OSError:
+        with open(template_file, "r") as file:
+            qss = string.Template(file.read()).safe_substitute(colors)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(cache_file, "w") as file:
+                file.write(qss)
+        except OSError as e:
+            print(e)
+
+    _compiled[key] = qss
+    return qss
+
+
+def apply_theme(palette: str, theme: str) -> None:
+    # One application-wide stylesheet, swapped only when the pair changes,
+    # instead of per-window stylesheets that re-polish every child
+    global _applied
+    if (palette, theme) == _applied:
+        return
+    QApplication.instance().setStyleSheet(compile_theme(palette, theme))
+    _applied = (palette, theme)
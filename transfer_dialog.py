@@ -0,0 +1,39 @@
+from PySide6.QtWidgets import QProgressDialog
+from PySide6.QtCore import Qt, Signal
+
+
+# Progress dialog for an import or export running on the database worker.
+# The job reports counts through a queued signal and stops at its next chunk
+# once Cancel is pressed; whatever the job raises comes back as the exception
+# instead of a result so the window can show it.
+class TransferDialog(QProgressDialog):
+    progressed = Signal(str)
+
+    def __init__(self, parent, db, title: str):
+        super().__init__(title, "Cancel", 0, 0, parent)
+        self.setWindowTitle("Mandarina 🍊")
+        self.setWindowModality(Qt.WindowModal)
+        self.setMinimumDuration(0)
+        self.db = db
+        self.stopped = False
+        self.progressed.connect(self.setLabelText)
+        self.canceled.connect(self._stop)
+
+    def _stop(self):
+        self.stopped = True
+
+    def run(self, job, verb: str, done) -> None:
+        # job(repo, progress) runs on the worker thread; done(result) runs on
+        # this one afterwards
+        def progress(count):
+            self.progressed.emit(f"{verb} {count} tasks…")
+            return self.stopped
+
+        def finished(result):
+            self.canceled.disconnect(self._stop)
+            self.close()
+            self.deleteLater()
+            done(result)
+
+        self.show()
+        self.db.submit(lambda repo: job(repo, progress), finished, finished)